@@ -0,0 +1,30 @@
+"""
+Measures per-request overhead of mocked httpcore requests.
+
+Usage: python benchmarks/bench_mocks.py [number]
+"""
+import sys
+import timeit
+
+import httpcore
+
+import respx
+
+
+def main(number: int = 10_000) -> None:
+    with respx.mock(using="httpcore") as respx_mock:
+        respx_mock.get("https://foo.bar/") % 204
+
+        with httpcore.ConnectionPool() as pool:
+            request = httpcore.Request("GET", "https://foo.bar/")
+            handle_request = pool.handle_request
+            seconds = min(
+                timeit.repeat(lambda: handle_request(request), number=number, repeat=5)
+            )
+
+    us_per_request = seconds / number * 1_000_000
+    print(f"HTTPCoreMocker: {us_per_request:.2f} µs/request")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:2]))
@@ -1,7 +1,11 @@
 from .__version__ import __version__
+from .cassettes import Cassette
 from .handlers import ASGIHandler, WSGIHandler
 from .models import MockResponse, Route
+from .observers import Observer, ResolveStats
 from .router import MockRouter, Router
+from .sequences import sequence
+from .server import serve
 from .utils import SetCookie
 
 from .api import (  # isort:skip
@@ -15,6 +19,7 @@ from .api import (  # isort:skip
     pop,
     route,
     add,
+    load_har,
     request,
     get,
     post,
@@ -31,10 +36,15 @@ __all__ = [
     "MockResponse",
     "MockRouter",
     "ASGIHandler",
+    "Cassette",
     "WSGIHandler",
     "Router",
     "Route",
+    "Observer",
+    "ResolveStats",
     "SetCookie",
+    "sequence",
+    "serve",
     "mock",
     "routes",
     "calls",
@@ -45,6 +55,7 @@ __all__ = [
     "pop",
     "route",
     "add",
+    "load_har",
     "request",
     "get",
     "post",
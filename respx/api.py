@@ -1,3 +1,4 @@
+import os
 from typing import Any, Optional, Union, overload
 
 from .models import CallList, Route
@@ -56,6 +57,16 @@ def add(route: Route, *, name: Optional[str] = None) -> Route:
     return mock.add(route, name=name)
 
 
+def load_har(
+    path: Union[str, "os.PathLike[str]"],
+    *patterns: Pattern,
+    name: Optional[str] = None,
+    **lookups: Any,
+) -> Route:
+    global mock
+    return mock.load_har(path, *patterns, name=name, **lookups)
+
+
 def request(
     method: str,
     url: Optional[URLPatternTypes] = None,
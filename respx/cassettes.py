@@ -0,0 +1,197 @@
+import hashlib
+import mmap
+import os
+import struct
+import threading
+from typing import (
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+import httpx
+
+# Header of cassette files, followed by appended entries
+CASSETTE_HEADER = b"RESPX-CASSETTE/1\n"
+
+# Entry: request fingerprint, response status code, headers size and body size
+ENTRY = struct.Struct(">16sHII")
+
+RawHeaders = Sequence[Tuple[bytes, bytes]]
+
+
+class RecordingStream(httpx.SyncByteStream, httpx.AsyncByteStream):
+    """
+    Sync and async byte stream, passing a wrapped stream through untouched,
+    while collecting its chunks to record once fully consumed.
+    """
+
+    def __init__(
+        self,
+        stream: Union[Iterable[bytes], httpx.AsyncByteStream],
+        on_complete: Callable[[bytes], None],
+    ) -> None:
+        self.stream = stream
+        self.on_complete = on_complete
+
+    def __iter__(self) -> Iterator[bytes]:
+        chunks = []
+        for chunk in self.stream:  # type: ignore[union-attr]
+            chunks.append(chunk)
+            yield chunk
+        self.on_complete(b"".join(chunks))
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        chunks = []
+        async for chunk in self.stream:  # type: ignore[union-attr]
+            chunks.append(chunk)
+            yield chunk
+        self.on_complete(b"".join(chunks))
+
+    def close(self) -> None:
+        if hasattr(self.stream, "close"):
+            self.stream.close()
+
+    async def aclose(self) -> None:
+        if hasattr(self.stream, "aclose"):
+            await self.stream.aclose()
+
+
+class Cassette:
+    """
+    Append-only file of recorded pass-through responses, replayed by request
+    fingerprint, i.e. method and url.
+
+    Entries are indexed when loaded, by only scanning their fixed size headers,
+    while response headers and bodies are read from the memory mapped file when
+    replayed. Recorded responses for the same request are replayed in order,
+    repeating the last one.
+    """
+
+    # Replay only fingerprints method and url, i.e. no need to pre-read requests
+    reads_content = False
+
+    def __init__(self, path: Union[str, "os.PathLike[str]"]) -> None:
+        self.path = os.fspath(path)
+        self._index: Dict[bytes, List[Tuple[int, int, int, int]]] = {}
+        self._replays: Dict[bytes, int] = {}
+        self._mapping: Optional[mmap.mmap] = None
+        self._lock = threading.Lock()
+        self._load()
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._index.values())
+
+    def __call__(self, request: httpx.Request) -> Optional[httpx.Response]:
+        """
+        Replays a recorded response for given request, or `None` if not recorded.
+        Usable as route side effect.
+        """
+        key = self.fingerprint(request)
+        entries = self._index.get(key)
+        if not entries:
+            return None
+
+        with self._lock:
+            replays = self._replays.get(key, 0)
+            self._replays[key] = replays + 1
+            offset, status_code, headers_size, body_size = entries[
+                min(replays, len(entries) - 1)
+            ]
+            mapping = self._map()
+
+        raw_headers = mapping[offset : offset + headers_size]
+        body = mapping[offset + headers_size : offset + headers_size + body_size]
+        headers = [
+            (name, value)
+            for name, _, value in (
+                line.partition(b": ") for line in raw_headers.split(b"\r\n") if line
+            )
+        ]
+        return httpx.Response(
+            status_code,
+            headers=headers,
+            stream=httpx.ByteStream(body),
+            request=request,
+        )
+
+    @staticmethod
+    def fingerprint(request: httpx.Request) -> bytes:
+        fingerprint = f"{request.method} {request.url}".encode()
+        return hashlib.sha256(fingerprint).digest()[:16]
+
+    def record(
+        self,
+        request: httpx.Request,
+        status_code: int,
+        headers: RawHeaders,
+        stream: Union[Iterable[bytes], httpx.AsyncByteStream],
+    ) -> RecordingStream:
+        """
+        Wraps given response stream, appending the response once fully read.
+        """
+        key = self.fingerprint(request)
+
+        def on_complete(content: bytes) -> None:
+            self.append(key, status_code, headers, content)
+
+        return RecordingStream(stream, on_complete)
+
+    def append(
+        self, key: bytes, status_code: int, headers: RawHeaders, content: bytes
+    ) -> None:
+        raw_headers = b"".join(
+            name + b": " + value + b"\r\n" for name, value in headers
+        )
+        entry = ENTRY.pack(key, status_code, len(raw_headers), len(content))
+
+        with self._lock, open(self.path, "ab") as f:
+            if f.tell() == 0:
+                f.write(CASSETTE_HEADER)
+            offset = f.tell() + ENTRY.size
+            f.write(entry + raw_headers + content)
+            self._index.setdefault(key, []).append(
+                (offset, status_code, len(raw_headers), len(content))
+            )
+            self._mapping = None  # Re-map grown file on next replay
+
+    def _map(self) -> mmap.mmap:
+        if self._mapping is None:
+            with open(self.path, "rb") as f:
+                self._mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mapping
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path) or not os.path.getsize(self.path):
+            return
+
+        mapping = self._map()
+        if mapping[: len(CASSETTE_HEADER)] != CASSETTE_HEADER:
+            raise ValueError(f"Invalid respx cassette file: {self.path!r}")
+
+        offset = len(CASSETTE_HEADER)
+        size = len(mapping)
+        while offset + ENTRY.size <= size:
+            key, status_code, headers_size, body_size = ENTRY.unpack_from(
+                mapping, offset
+            )
+            end = offset + ENTRY.size + headers_size + body_size
+            if end > size:
+                break
+            self._index.setdefault(key, []).append(
+                (offset + ENTRY.size, status_code, headers_size, body_size)
+            )
+            offset = end
+
+        if offset < size:
+            # Drop truncated, e.g. interrupted, last entry before appending again
+            mapping.close()
+            self._mapping = None
+            os.truncate(self.path, offset)
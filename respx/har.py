@@ -0,0 +1,183 @@
+import base64
+import json
+import mmap
+import os
+import re
+import threading
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
+
+import httpx
+
+from .utils import RAW_CONTENT_HEADERS
+
+# UTF-8 byte order mark, e.g. written by some browsers' HAR exports
+BOM = b"\xef\xbb\xbf"
+WHITESPACE = re.compile(rb"[ \t\n\r]*")
+STRING = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"')
+NUMBER = re.compile(rb"-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?")
+CONSTANTS = ((b"true", True), (b"false", False), (b"null", None))
+
+
+class LazyText(NamedTuple):
+    """
+    Position of a still encoded JSON string, e.g. a HAR content text.
+    """
+
+    start: int
+    end: int
+
+
+class Scanner:
+    """
+    Minimal JSON scanner, leaving `text` values encoded in the scanned buffer.
+    """
+
+    def __init__(self, data: Union[bytes, mmap.mmap]) -> None:
+        self.data = data
+
+    def scan(self) -> Any:
+        start = len(BOM) if self.data[: len(BOM)] == BOM else 0
+        value, pos = self.value(start)
+        if self.skip(pos) != len(self.data):
+            raise ValueError(f"Extra data at position {pos}")
+        return value
+
+    def skip(self, pos: int) -> int:
+        return WHITESPACE.match(self.data, pos).end()  # type: ignore[union-attr]
+
+    def value(self, pos: int, lazy: bool = False) -> Tuple[Any, int]:
+        pos = self.skip(pos)
+        char = self.data[pos : pos + 1]
+        if char == b"{":
+            return self.object(pos + 1)
+        if char == b"[":
+            return self.array(pos + 1)
+        if char == b'"':
+            match = STRING.match(self.data, pos)
+            if match is None:
+                raise ValueError(f"Unterminated string at position {pos}")
+            if lazy:
+                return LazyText(pos, match.end()), match.end()
+            return json.loads(match.group()), match.end()
+
+        match = NUMBER.match(self.data, pos)
+        if match is not None:
+            return json.loads(match.group()), match.end()
+        for constant, value in CONSTANTS:
+            if self.data[pos : pos + len(constant)] == constant:
+                return value, pos + len(constant)
+
+        raise ValueError(f"Unexpected value at position {pos}")
+
+    def object(self, pos: int) -> Tuple[Dict[str, Any], int]:
+        obj: Dict[str, Any] = {}
+        pos = self.skip(pos)
+        if self.data[pos : pos + 1] == b"}":
+            return obj, pos + 1
+
+        while True:
+            key, pos = self.value(pos)
+            if not isinstance(key, str):
+                raise ValueError(f"Expected key at position {pos}")
+            pos = self.expect(pos, b":")
+            obj[key], pos = self.value(pos, lazy=key == "text")
+            pos = self.skip(pos)
+            if self.data[pos : pos + 1] == b"}":
+                return obj, pos + 1
+            pos = self.expect(pos, b",")
+
+    def array(self, pos: int) -> Tuple[List[Any], int]:
+        array: List[Any] = []
+        pos = self.skip(pos)
+        if self.data[pos : pos + 1] == b"]":
+            return array, pos + 1
+
+        while True:
+            value, pos = self.value(pos)
+            array.append(value)
+            pos = self.skip(pos)
+            if self.data[pos : pos + 1] == b"]":
+                return array, pos + 1
+            pos = self.expect(pos, b",")
+
+    def expect(self, pos: int, char: bytes) -> int:
+        pos = self.skip(pos)
+        if self.data[pos : pos + 1] != char:
+            raise ValueError(f"Expected {char!r} at position {pos}")
+        return pos + 1
+
+
+class HAR:
+    """
+    HAR file of recorded responses, replayed by request method and url.
+
+    Entries are indexed when loaded, while response content is left encoded in
+    the memory mapped file, and only decoded when replayed. Recorded responses
+    for the same request are replayed in order, repeating the last one.
+    """
+
+    # Replay only matches method and url, i.e. no need to pre-read requests
+    reads_content = False
+
+    def __init__(self, path: Union[str, "os.PathLike[str]"]) -> None:
+        self.path = os.fspath(path)
+        self._index: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        self._replays: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+        try:
+            with open(self.path, "rb") as f:
+                self._mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._load(Scanner(self._mapping).scan())
+        except (ValueError, KeyError, TypeError) as error:
+            raise ValueError(f"Invalid HAR file {self.path!r}: {error}") from error
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._index.values())
+
+    def __call__(self, request: httpx.Request) -> Optional[httpx.Response]:
+        """
+        Replays a recorded response for given request, or `None` if not recorded.
+        Usable as route side effect.
+        """
+        key = (request.method, str(request.url))
+        entries = self._index.get(key)
+        if not entries:
+            return None
+
+        with self._lock:
+            replays = self._replays.get(key, 0)
+            self._replays[key] = replays + 1
+        entry = entries[min(replays, len(entries) - 1)]
+
+        headers = [
+            (header["name"], header["value"])
+            for header in entry.get("headers", ())
+            if not header["name"].startswith(":")  # HTTP/2 pseudo headers
+            and header["name"].lower() not in RAW_CONTENT_HEADERS
+        ]
+        return httpx.Response(
+            entry["status"],
+            headers=headers,
+            content=self._decode_content(entry.get("content", {})),
+            request=request,
+        )
+
+    def _decode_content(self, content: Dict[str, Any]) -> bytes:
+        text = content.get("text")
+        if isinstance(text, LazyText):
+            text = json.loads(self._mapping[text.start : text.end])
+        if not text:
+            return b""
+        if content.get("encoding") == "base64":
+            return base64.b64decode(text)
+        return text.encode("utf-8")
+
+    def _load(self, har: Dict[str, Any]) -> None:
+        for entry in har["log"]["entries"]:
+            request, response = entry["request"], entry["response"]
+            if not response["status"]:
+                continue  # Blocked, or failed, browser request
+            url = httpx.URL(request["url"])
+            key = (request["method"].upper(), str(url))
+            self._index.setdefault(key, []).append(response)
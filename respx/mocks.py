@@ -1,26 +1,150 @@
 import inspect
 from abc import ABC
+from contextvars import ContextVar
+from functools import cached_property
 from types import MappingProxyType
-from typing import TYPE_CHECKING, ClassVar, Dict, List, Type
+from typing import TYPE_CHECKING, ClassVar, Dict, FrozenSet, List, Optional, Tuple, Type
 from unittest import mock
+from weakref import WeakKeyDictionary, WeakSet
 
-import httpcore
 import httpx
 
-from respx.patterns import parse_url
+from respx.patterns import get_hosts, get_scheme_port, get_url_components, parse_url
+from respx.utils import RAW_CONTENT_HEADERS, URLComponents
 
-from .models import AllMockedAssertionError, PassThrough
-from .transports import TryTransport
+from .models import AllMockedAssertionError, Route
+from .transports import HandlerTransport, RecordingTransport, TryTransport
 
 if TYPE_CHECKING:
+    import httpcore  # pragma: nocover
+
+    from .cassettes import Cassette  # pragma: nocover
     from .router import Router  # pragma: nocover
 
 __all__ = ["Mocker", "HTTPCoreMocker"]
 
 
+class HTTPCoreRequest(httpx.Request):
+    """
+    Lazy `HTTPX` request view of a `httpcore` request.
+
+    Method and url components are read straight from the `httpcore` request,
+    while the full `url` and `headers` are only parsed once accessed.
+    """
+
+    def __init__(self, request: "httpcore.Request") -> None:
+        self._request = request
+        self._url: Optional[httpx.URL] = None
+        self._headers: Optional[httpx.Headers] = None
+        method = request.method
+        self.method = (
+            method.decode("ascii") if isinstance(method, bytes) else method
+        ).upper()
+        self.stream = request.stream  # type: ignore[assignment]
+        self.extensions = dict(request.extensions)
+
+    @property
+    def url(self) -> httpx.URL:
+        if self._url is None:
+            url = self._request.url
+            self._url = parse_url((url.scheme, url.host, url.port, url.target))
+        return self._url
+
+    @url.setter
+    def url(self, value: httpx.URL) -> None:
+        self._url = value
+        self.__dict__.pop("url_components", None)
+
+    @property
+    def headers(self) -> httpx.Headers:
+        if self._headers is None:
+            self._headers = httpx.Headers(self._request.headers)
+        return self._headers
+
+    @headers.setter
+    def headers(self, value: httpx.Headers) -> None:
+        self._headers = value
+
+    @cached_property
+    def url_components(self) -> URLComponents:
+        """
+        Parsed url components, avoiding to parse the full url when not needed.
+        Falls back to the parsed url for anything httpx would normalize.
+        """
+        if self._url is not None:
+            return self._url_components(self._url)
+
+        url = self._request.url
+        scheme = url.scheme.decode("ascii").lower()
+        host = url.host.decode("ascii").lower()
+        path = url.target.split(b"?", 1)[0]
+        if (
+            b"xn--" in url.host
+            or not path.startswith(b"/")
+            or b"%" in path
+            or b"/." in path
+        ):
+            return self._url_components(self.url)
+
+        port = url.port if url.port != get_scheme_port(scheme) else None
+        return URLComponents(scheme, host, port, path.decode("ascii"))
+
+    @staticmethod
+    def _url_components(url: httpx.URL) -> URLComponents:
+        return URLComponents(url.scheme, url.host, url.port, url.path)
+
+    def __getstate__(self):
+        return {
+            "method": self.method,
+            "url": self.url,
+            "headers": self.headers,
+            **({"_content": self._content} if hasattr(self, "_content") else {}),
+        }
+
+    def __setstate__(self, state):
+        self._url = self._headers = None
+        super().__setstate__(state)
+
+
+class DispatchIndex:
+    """
+    Routers by the hosts their routes can match, keeping dispatch order, where
+    routers auto mocking, or with any route not requiring a host, match any host.
+    """
+
+    def __init__(self, routers: Tuple["Router", ...]) -> None:
+        self.generation = Route._generation
+        hosts = {router: self.get_hosts(router) for router in routers}
+        self.any_host = tuple(router for router in routers if hosts[router] is None)
+        self.routers: Dict[str, Tuple["Router", ...]] = {}
+        for host in frozenset().union(*filter(None, hosts.values())):
+            self.routers[host] = tuple(
+                router
+                for router, router_hosts in hosts.items()
+                if router_hosts is None or host in router_hosts
+            )
+
+    @staticmethod
+    def get_hosts(router: "Router") -> Optional[FrozenSet[str]]:
+        if not router._assert_all_mocked:
+            return None  # Auto mocks any request
+        hosts: FrozenSet[str] = frozenset()
+        for route in router.routes:
+            route_hosts = get_hosts(route.pattern)
+            if route_hosts is None:
+                return None
+            hosts |= route_hosts
+        return hosts
+
+
 class Mocker(ABC):
+    _context_dispatch: ClassVar["ContextVar[Tuple[Router, ...]]"]
+    _dispatch: ClassVar[Tuple["Router", ...]]
+    _index: ClassVar[Optional["DispatchIndex"]]
     _patches: ClassVar[List[mock._patch]]
+    _recordings: ClassVar["WeakKeyDictionary[httpx.Request, Cassette]"]
     name: ClassVar[str]
+    context_routers: ClassVar[List["Router"]]
     routers: ClassVar[List["Router"]]
     targets: ClassVar[List[str]]
     target_methods: ClassVar[List[str]]
@@ -40,20 +164,72 @@ class Mocker(ABC):
             )
 
         cls.routers = []
+        cls.context_routers = []
+        cls._dispatch = ()
+        cls._index = None
+        cls._context_dispatch = ContextVar(f"respx_{cls.name}_routers", default=())
         cls._patches = []
+        cls._recordings = WeakKeyDictionary()
         cls.__registry[cls.name] = cls
 
     @classmethod
-    def register(cls, router: "Router") -> None:
-        cls.routers.append(router)
+    def register(cls, router: "Router", *, context_local: bool = False) -> None:
+        """
+        Registers router globally, or only for the current context, e.g. asyncio
+        task, and tasks created within, resolved before any global routers.
+        """
+        if context_local:
+            cls.context_routers.append(router)
+            cls._context_dispatch.set((*cls._context_dispatch.get(), router))
+        else:
+            cls.routers.append(router)
+            cls._dispatch = tuple(cls.routers)
+            cls._index = None
 
     @classmethod
     def unregister(cls, router: "Router") -> bool:
+        if router in cls.context_routers:
+            cls.context_routers.remove(router)
+            cls._context_dispatch.set(
+                tuple(r for r in cls._context_dispatch.get() if r is not router)
+            )
+            return True
         if router in cls.routers:
             cls.routers.remove(router)
+            cls._dispatch = tuple(cls.routers)
+            cls._index = None
             return True
         return False
 
+    @classmethod
+    def dispatch(cls) -> Tuple["Router", ...]:
+        """
+        Returns routers to resolve with, in the current context.
+        """
+        context_routers = cls._context_dispatch.get()
+        if context_routers:
+            return context_routers + cls._dispatch
+        return cls._dispatch
+
+    @classmethod
+    def candidates(cls, request: httpx.Request) -> Tuple["Router", ...]:
+        """
+        Returns routers that may resolve given request, in order, looked up by host
+        in an index merged across global routers, rebuilt once routes change.
+        """
+        index = cls._index
+        if index is None or index.generation != Route._generation:
+            index = cls._index = DispatchIndex(cls._dispatch)
+        routers = index.routers.get(get_url_components(request).host, index.any_host)
+        context_routers = cls._context_dispatch.get()
+        if context_routers:
+            return context_routers + routers
+        return routers
+
+    @classmethod
+    def reads_content(cls) -> bool:
+        return any(router.reads_content for router in cls.dispatch())
+
     @classmethod
     def add_targets(cls, *targets: str) -> None:
         targets = tuple(filter(lambda t: t not in cls.targets, targets))
@@ -89,7 +265,7 @@ class Mocker(ABC):
     @classmethod
     def stop(cls, force: bool = False) -> None:
         # Ensure we don't stop patching when registered transports exists
-        if cls.routers and not force:
+        if (cls.routers or cls.context_routers) and not force:
             return
 
         # Stop patching HTTPX
@@ -106,34 +282,57 @@ class Mocker(ABC):
 
     @classmethod
     def handler(cls, httpx_request):
-        httpx_response = None
-        assertion_error = None
-        for router in cls.routers:
-            try:
-                httpx_response = router.handler(httpx_request)
-            except AllMockedAssertionError as error:
-                assertion_error = error
-                continue
-            else:
-                break
-        if assertion_error and not httpx_response:
-            raise assertion_error
-        return httpx_response
+        """
+        Resolve quietly, i.e. only assert all mocked once all routers missed.
+        Returns the mocked response, or the request itself to pass through.
+        """
+        for router in cls.candidates(httpx_request):
+            resolved = router.resolve(httpx_request, quiet=True)
+            if resolved.response is not None:
+                return cls._resolved_response(httpx_request, resolved)
+        raise AllMockedAssertionError(f"RESPX: {httpx_request!r} not mocked!")
 
     @classmethod
     async def async_handler(cls, httpx_request):
-        httpx_response = None
-        assertion_error = None
-        for router in cls.routers:
-            try:
-                httpx_response = await router.async_handler(httpx_request)
-            except AllMockedAssertionError as error:
-                assertion_error = error
-                continue
-            else:
-                break
-        if assertion_error and not httpx_response:
-            raise assertion_error
+        for router in cls.candidates(httpx_request):
+            resolved = await router.aresolve(httpx_request, quiet=True)
+            if resolved.response is not None:
+                return cls._resolved_response(httpx_request, resolved)
+        raise AllMockedAssertionError(f"RESPX: {httpx_request!r} not mocked!")
+
+    @classmethod
+    def _resolved_response(cls, httpx_request, resolved):
+        # Keep track of passed through requests to record, by their route cassette
+        if resolved.response is httpx_request:
+            assert resolved.route is not None
+            if resolved.route._recorder is not None:
+                cls._recordings[httpx_request] = resolved.route._recorder
+        return resolved.response
+
+    @classmethod
+    def record_response(cls, httpx_request, httpx_response):
+        """
+        Records passed through response to its route cassette, if any.
+        """
+        cassette = cls._recordings.pop(httpx_request, None)
+        if cassette is None:
+            return httpx_response
+
+        status_code = httpx_response.status_code
+        headers = httpx_response.headers.raw
+        if hasattr(httpx_response, "_content"):
+            # Already read content is decoded, i.e. skip headers of the raw content
+            headers = [
+                (name, value)
+                for name, value in headers
+                if name.decode("latin-1").lower() not in RAW_CONTENT_HEADERS
+            ]
+            key = cassette.fingerprint(httpx_request)
+            cassette.append(key, status_code, headers, httpx_response.content)
+        else:
+            httpx_response.stream = cassette.record(
+                httpx_request, status_code, headers, httpx_response.stream
+            )
         return httpx_response
 
     @classmethod
@@ -151,15 +350,35 @@ class HTTPXMocker(Mocker):
 
     @classmethod
     def mock(cls, spec):
+        # Cache wrapped transports per client and real transport, while they're alive
+        transports: WeakKeyDictionary = WeakKeyDictionary()
+
         def _transport_for_url(self, *args, **kwargs):
-            handler = (
-                cls.async_handler
-                if inspect.iscoroutinefunction(self.request)
-                else cls.handler
-            )
-            mock_transport = httpx.MockTransport(handler)
             pass_through_transport = spec(self, *args, **kwargs)
-            transport = TryTransport([mock_transport, pass_through_transport])
+
+            try:
+                client_transports = transports.get(self)
+                if client_transports is None:
+                    client_transports = transports[self] = WeakKeyDictionary()
+                transport = client_transports.get(pass_through_transport)
+            except TypeError:
+                # Unhashable, or not weak referenceable, client or transport
+                client_transports = transport = None
+
+            if transport is None:
+                handler = (
+                    cls.async_handler
+                    if inspect.iscoroutinefunction(self.request)
+                    else cls.handler
+                )
+                mock_transport = HandlerTransport(handler)
+                recording_transport = RecordingTransport(
+                    pass_through_transport, cls.record_response
+                )
+                transport = TryTransport([mock_transport, recording_transport])
+                if client_transports is not None:
+                    client_transports[pass_through_transport] = transport
+
             return transport
 
         return _transport_for_url
@@ -172,10 +391,10 @@ class AbstractRequestMocker(Mocker):
             # Prevent mocking mock
             return spec
 
-        argspec = inspect.getfullargspec(spec)
+        bind_args = cls._compile_binder(spec)
 
         def mock(self, *args, **kwargs):
-            kwargs = cls._merge_args_and_kwargs(argspec, args, kwargs)
+            kwargs = bind_args(*args, **kwargs)
             request = cls.to_httpx_request(**kwargs)
             request, kwargs = cls.prepare_sync_request(request, **kwargs)
             response = cls._send_sync_request(
@@ -184,7 +403,7 @@ class AbstractRequestMocker(Mocker):
             return response
 
         async def amock(self, *args, **kwargs):
-            kwargs = cls._merge_args_and_kwargs(argspec, args, kwargs)
+            kwargs = bind_args(*args, **kwargs)
             request = cls.to_httpx_request(**kwargs)
             request, kwargs = await cls.prepare_async_request(request, **kwargs)
             response = await cls._send_async_request(
@@ -195,24 +414,51 @@ class AbstractRequestMocker(Mocker):
         return amock if inspect.iscoroutinefunction(spec) else mock
 
     @classmethod
-    def _merge_args_and_kwargs(cls, argspec, args, kwargs):
-        arg_names = argspec.args[1:]  # Omit self
-        new_kwargs = (
-            dict(zip(arg_names[-len(argspec.defaults) :], argspec.defaults))
-            if argspec.defaults
-            else dict()
+    def _compile_binder(cls, spec):
+        """
+        Compiles a function, once per target signature, binding given args to kwargs.
+        """
+        params, names = [], []
+        namespace = {}
+        keyword_only = False
+        parameters = list(inspect.signature(spec).parameters.values())[1:]  # Omit self
+        for i, param in enumerate(parameters):
+            if param.kind is param.VAR_POSITIONAL:
+                params.append(f"*{param.name}")
+                keyword_only = True
+            elif param.kind is param.VAR_KEYWORD:
+                params.append(f"**{param.name}")
+                names.append(f"**{param.name}")
+            else:
+                if param.kind is param.KEYWORD_ONLY and not keyword_only:
+                    params.append("*")
+                    keyword_only = True
+                if param.default is param.empty:
+                    params.append(param.name)
+                else:
+                    namespace[f"_default_{i}"] = param.default
+                    params.append(f"{param.name}=_default_{i}")
+                names.append(f"{param.name!r}: {param.name}")
+
+        source = (
+            f"def bind_args({', '.join(params)}):\n"
+            f"    return {{{', '.join(names)}}}\n"
         )
-        new_kwargs.update(zip(arg_names, args))
-        new_kwargs.update(kwargs)
-        return new_kwargs
+        exec(source, namespace)
+        return namespace["bind_args"]
 
     @classmethod
     def _send_sync_request(cls, httpx_request, *, target_spec, instance, **kwargs):
         try:
             httpx_response = cls.handler(httpx_request)
-        except PassThrough:
+        except Exception:
+            httpx_request.read()  # Read any unread body for call records
+            raise
+        if isinstance(httpx_response, httpx.Request):
             response = target_spec(instance, **kwargs)
+            response = cls.record_response(httpx_request, response)
         else:
+            httpx_request.read()  # Read any unread body for call records
             response = cls.from_sync_httpx_response(httpx_response, instance, **kwargs)
         return response
 
@@ -222,9 +468,14 @@ class AbstractRequestMocker(Mocker):
     ):
         try:
             httpx_response = await cls.async_handler(httpx_request)
-        except PassThrough:
+        except Exception:
+            await httpx_request.aread()  # Read any unread body for call records
+            raise
+        if isinstance(httpx_response, httpx.Request):
             response = await target_spec(instance, **kwargs)
+            response = cls.record_response(httpx_request, response)
         else:
+            await httpx_request.aread()  # Read any unread body for call records
             response = await cls.from_async_httpx_response(
                 httpx_response, instance, **kwargs
             )
@@ -233,17 +484,19 @@ class AbstractRequestMocker(Mocker):
     @classmethod
     def prepare_sync_request(cls, httpx_request, **kwargs):
         """
-        Sync pre-read request body
+        Sync pre-read request body, when needed by any route
         """
-        httpx_request.read()
+        if cls.reads_content():
+            httpx_request.read()
         return httpx_request, kwargs
 
     @classmethod
     async def prepare_async_request(cls, httpx_request, **kwargs):
         """
-        Async pre-read request body
+        Async pre-read request body, when needed by any route
         """
-        await httpx_request.aread()
+        if cls.reads_content():
+            await httpx_request.aread()
         return httpx_request, kwargs
 
     @classmethod
@@ -271,6 +524,8 @@ class HTTPCoreMocker(AbstractRequestMocker):
     ]
     target_methods = ["handle_request", "handle_async_request"]
 
+    _recorded: ClassVar["WeakSet[httpcore.Request]"] = WeakSet()
+
     @classmethod
     def prepare_sync_request(cls, httpx_request, **kwargs):
         """
@@ -291,36 +546,34 @@ class HTTPCoreMocker(AbstractRequestMocker):
         kwargs["request"].stream = httpx_request.stream
         return httpx_request, kwargs
 
+    @classmethod
+    def record_response(cls, httpx_request, response):
+        """
+        Records passed through `httpcore` response to its route cassette, if any.
+        """
+        cassette = cls._recordings.pop(httpx_request, None)
+        # Skip if already recorded by nested pass-through, e.g. pool to connection
+        if cassette is not None and httpx_request._request not in cls._recorded:
+            cls._recorded.add(httpx_request._request)
+            response.stream = cassette.record(
+                httpx_request, response.status, response.headers, response.stream
+            )
+        return response
+
     @classmethod
     def to_httpx_request(cls, **kwargs):
         """
-        Create a `HTTPX` request from transport request arg.
+        Create a lazy `HTTPX` request from transport request arg.
         """
-        request = kwargs["request"]
-        method = (
-            request.method.decode("ascii")
-            if isinstance(request.method, bytes)
-            else request.method
-        )
-        raw_url = (
-            request.url.scheme,
-            request.url.host,
-            request.url.port,
-            request.url.target,
-        )
-        return httpx.Request(
-            method,
-            parse_url(raw_url),
-            headers=request.headers,
-            stream=request.stream,
-            extensions=request.extensions,
-        )
+        return HTTPCoreRequest(kwargs["request"])
 
     @classmethod
     def from_sync_httpx_response(cls, httpx_response, target, **kwargs):
         """
         Create a `httpcore` response from a `HTTPX` response.
         """
+        import httpcore
+
         return httpcore.Response(
             status=httpx_response.status_code,
             headers=httpx_response.headers.raw,
@@ -1,6 +1,14 @@
+import copy
 import inspect
+import itertools
+import mmap
+import os
+import threading
 from typing import (
+    TYPE_CHECKING,
     Any,
+    AsyncIterator,
+    ClassVar,
     Dict,
     Iterator,
     List,
@@ -16,9 +24,10 @@ from warnings import warn
 
 import httpx
 
-from respx.utils import SetCookie
+from respx.utils import SetCookie, get_arg_names
 
 from .patterns import M, Pattern
+from .timing import Delay, DelayTypes, parse_bandwidth, parse_delay
 from .types import (
     CallableSideEffect,
     Content,
@@ -30,6 +39,9 @@ from .types import (
     SideEffectTypes,
 )
 
+if TYPE_CHECKING:
+    from .cassettes import Cassette  # pragma: nocover
+
 
 def clone_response(response: httpx.Response, request: httpx.Request) -> httpx.Response:
     """
@@ -45,6 +57,50 @@ def clone_response(response: httpx.Response, request: httpx.Request) -> httpx.Re
     return response
 
 
+class ResponseTemplate(NamedTuple):
+    """
+    Frozen, pre-read response, rendered per request without re-encoding.
+    """
+
+    status_code: int
+    headers: httpx.Headers
+    stream: httpx.ByteStream
+    content: bytes
+    extensions: Dict[str, Any]
+
+    @classmethod
+    def from_response(cls, response: httpx.Response) -> Optional["ResponseTemplate"]:
+        """
+        Freezes given response, unless bound to a request or having a custom stream.
+        """
+        if response._request is not None:
+            return None
+        if not isinstance(response.stream, httpx.ByteStream):
+            return None
+        content = response.read()
+        return cls(
+            status_code=response.status_code,
+            headers=httpx.Headers(response.headers),
+            stream=response.stream,
+            content=content,
+            extensions=dict(response.extensions),
+        )
+
+    def render(self, request: Optional[httpx.Request]) -> httpx.Response:
+        """
+        Creates a response for given request, sharing the pre-read stream and body.
+        """
+        response = httpx.Response(
+            self.status_code,
+            headers=self.headers,
+            stream=self.stream,
+            request=request,
+            extensions=dict(self.extensions),
+        )
+        response._content = self.content  # Already read
+        return response
+
+
 class Call(NamedTuple):
     request: httpx.Request
     optional_response: Optional[httpx.Response]
@@ -85,6 +141,62 @@ class CallList(list, mock.NonCallableMock):
         return call
 
 
+class FileStream(httpx.SyncByteStream, httpx.AsyncByteStream):
+    """
+    Sync and async byte stream, serving a file from a shared read-only memory map.
+
+    The file is mapped on first iteration, and the mapping is then shared by every
+    response using this stream, i.e. the file is never loaded into memory as a whole.
+    Closing the stream releases the mapping, once no response is reading it.
+    """
+
+    def __init__(
+        self, path: Union[str, "os.PathLike[str]"], *, chunk_size: int = 65_536
+    ) -> None:
+        if chunk_size < 1:
+            raise ValueError(f"Invalid chunk size: {chunk_size!r}")
+        self.path = os.fspath(path)
+        self.size = os.path.getsize(self.path)
+        self.chunk_size = chunk_size
+        self._mapping: Optional[mmap.mmap] = None
+        self._readers = 0
+        self._lock = threading.Lock()
+
+    @property
+    def mapping(self) -> mmap.mmap:
+        if self._mapping is None:
+            with open(self.path, "rb") as f:
+                self._mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mapping
+
+    def __iter__(self) -> Iterator[bytes]:
+        if not self.size:
+            return  # Empty files can't be mapped
+        with self._lock:
+            mapping = self.mapping
+            self._readers += 1
+        try:
+            for offset in range(0, self.size, self.chunk_size):
+                yield mapping[offset : offset + self.chunk_size]
+        finally:
+            with self._lock:
+                self._readers -= 1
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        for chunk in self:
+            yield chunk
+
+    def close(self) -> None:
+        with self._lock:
+            # Keep the mapping while read by other responses, i.e. sharing this stream
+            if self._mapping is not None and not self._readers:
+                self._mapping.close()
+                self._mapping = None
+
+    async def aclose(self) -> None:
+        self.close()
+
+
 class MockResponse(httpx.Response):
     def __init__(
         self,
@@ -94,6 +206,8 @@ class MockResponse(httpx.Response):
         content_type: Optional[str] = None,
         http_version: Optional[str] = None,
         cookies: Optional[Union[CookieTypes, Sequence[SetCookie]]] = None,
+        file: Optional[Union[str, "os.PathLike[str]"]] = None,
+        chunk_size: int = 65_536,
         **kwargs: Any,
     ) -> None:
         if not isinstance(content, (str, bytes)) and (
@@ -106,6 +220,10 @@ class MockResponse(httpx.Response):
 
         if content is not None:
             kwargs["content"] = content
+        if file is not None:
+            if content is not None or kwargs.get("stream") is not None:
+                raise TypeError("MockResponse file can't be combined with content")
+            kwargs["stream"] = FileStream(file, chunk_size=chunk_size)
         if http_version:
             kwargs["extensions"] = kwargs.get("extensions", {})
             kwargs["extensions"]["http_version"] = http_version.encode("ascii")
@@ -114,6 +232,9 @@ class MockResponse(httpx.Response):
         if content_type:
             self.headers["Content-Type"] = content_type
 
+        if isinstance(self.stream, FileStream):
+            self.headers.setdefault("Content-Length", str(self.stream.size))
+
         if cookies:
             if isinstance(cookies, dict):
                 cookies = tuple(cookies.items())
@@ -129,6 +250,10 @@ class MockResponse(httpx.Response):
 
 
 class Route:
+    # Bumped on any change to routes, or their side effects, i.e. invalidating any
+    # cached `reads_content` of routers
+    _generation: ClassVar[int] = 0
+
     def __init__(
         self,
         *patterns: Pattern,
@@ -136,8 +261,12 @@ class Route:
     ) -> None:
         self._pattern = M(*patterns, **lookups)
         self._return_value: Optional[httpx.Response] = None
+        self._response_template: Optional[ResponseTemplate] = None
         self._side_effect: Optional[SideEffectTypes] = None
         self._pass_through: bool = False
+        self._recorder: Optional["Cassette"] = None
+        self._delay: Optional[Delay] = None
+        self._bandwidth: Optional[float] = None
         self._name: Optional[str] = None
         self._snapshots: List[Tuple] = []
         self.calls = CallList(name=self)
@@ -190,6 +319,17 @@ class Route:
     def pattern(self, pattern: Pattern) -> None:
         raise NotImplementedError("Can't change route pattern.")
 
+    @property
+    def reads_content(self) -> bool:
+        """
+        Whether resolving this route may need the request body,
+        i.e. any content pattern, or a side effect that might read it.
+        """
+        effect = self._side_effect
+        if effect is not None and not isinstance(effect, (Exception, type)):
+            return getattr(effect, "reads_content", True)
+        return any(pattern.reads_content for pattern in self._pattern)
+
     @property
     def return_value(self) -> Optional[httpx.Response]:
         return self._return_value
@@ -200,6 +340,11 @@ class Route:
             raise TypeError(f"{return_value!r} is not an instance of httpx.Response")
         self.pass_through(False)
         self._return_value = return_value
+        self._response_template = (
+            ResponseTemplate.from_response(return_value)
+            if return_value is not None
+            else None
+        )
 
     @property
     def side_effect(
@@ -219,23 +364,31 @@ class Route:
             self._side_effect = iter(side_effect)
         else:
             self._side_effect = side_effect
+        Route._generation += 1
 
     def snapshot(self) -> None:
-        # Clone iterator-type side effect to not get pre-exhausted when rolled back
+        # Lazily clone iterator-type side effect to not get pre-exhausted when rolled
+        # back, i.e. only buffering items consumed since, allowing infinite iterators
         side_effect = self._side_effect
         if isinstance(side_effect, Iterator):
-            side_effects = tuple(side_effect)
-            self._side_effect = iter(side_effects)
-            side_effect = iter(side_effects)
+            if hasattr(side_effect, "__copy__"):
+                # Copyable position, e.g. a respx.sequence(), or an already tee'd one
+                side_effect = copy.copy(side_effect)
+            else:
+                self._side_effect, side_effect = itertools.tee(side_effect)
 
         self._snapshots.append(
             (
                 self._pattern,
                 self._name,
                 self._return_value,
+                self._response_template,
                 side_effect,
                 self._pass_through,
-                CallList(self.calls, name=self),
+                self._recorder,
+                self._delay,
+                self._bandwidth,
+                tuple(self.calls),
             ),
         )
 
@@ -244,18 +397,65 @@ class Route:
             return
 
         snapshot = self._snapshots.pop()
-        pattern, name, return_value, side_effect, pass_through, calls = snapshot
+        (
+            pattern,
+            name,
+            return_value,
+            response_template,
+            side_effect,
+            pass_through,
+            recorder,
+            delay,
+            bandwidth,
+            calls,
+        ) = snapshot
 
         self._pattern = pattern
         self._name = name
         self._return_value = return_value
+        self._response_template = response_template
         self._side_effect = side_effect
         self.pass_through(pass_through)
+        self._recorder = recorder
+        self._delay = delay
+        self._bandwidth = bandwidth
         self.calls[:] = calls
+        Route._generation += 1
 
     def reset(self) -> None:
         self.calls.clear()
 
+    def __getstate__(self) -> Tuple:
+        # Only static routes, i.e. with frozen responses, are serializable
+        if self._side_effect is not None:
+            raise TypeError(f"Can't serialize route with a side effect: {self!r}")
+        if self._return_value is not None and self._response_template is None:
+            raise TypeError(f"Can't serialize route with a streamed response: {self!r}")
+        if self._recorder is not None:
+            raise TypeError(f"Can't serialize a recording route: {self!r}")
+        return (
+            self._pattern,
+            self._name,
+            self._response_template,
+            self._pass_through,
+            self._delay,
+            self._bandwidth,
+        )
+
+    def __setstate__(self, state: Tuple) -> None:
+        pattern, name, template, pass_through, delay, bandwidth = state
+        self.__init__()  # type: ignore[misc]
+        self._pattern = pattern
+        self._name = name
+        if template is not None:
+            self._return_value = template.render(None)
+            self._response_template = template
+        self._pass_through = pass_through
+        self._delay = delay
+        self._bandwidth = bandwidth
+        self._snapshots.clear()
+        self.snapshot()
+
     def mock(
         self,
         return_value: Optional[httpx.Response] = None,
@@ -263,9 +463,13 @@ class Route:
         side_effect: Optional[
             Union[SideEffectTypes, Sequence[SideEffectListTypes]]
         ] = None,
+        delay: Optional[DelayTypes] = None,
+        bandwidth: Optional[float] = None,
     ) -> "Route":
         self.return_value = return_value
         self.side_effect = side_effect
+        self._delay = parse_delay(delay)
+        self._bandwidth = parse_bandwidth(bandwidth)
         return self
 
     def respond(
@@ -281,6 +485,10 @@ class Route:
         stream: Optional[Union[httpx.SyncByteStream, httpx.AsyncByteStream]] = None,
         content_type: Optional[str] = None,
         http_version: Optional[str] = None,
+        file: Optional[Union[str, "os.PathLike[str]"]] = None,
+        chunk_size: int = 65_536,
+        delay: Optional[DelayTypes] = None,
+        bandwidth: Optional[float] = None,
         **kwargs: Any,
     ) -> "Route":
         response = MockResponse(
@@ -294,12 +502,25 @@ class Route:
             stream=stream,
             content_type=content_type,
             http_version=http_version,
+            file=file,
+            chunk_size=chunk_size,
             **kwargs,
         )
-        return self.mock(return_value=response)
+        return self.mock(return_value=response, delay=delay, bandwidth=bandwidth)
 
     def pass_through(self, value: bool = True) -> "Route":
         self._pass_through = value
+        if not value:
+            self._recorder = None
+        return self
+
+    def record(self, cassette: "Cassette") -> "Route":
+        """
+        Passes matched requests through, recording their responses to given
+        cassette, unless already recorded and replayed.
+        """
+        self.pass_through(True)
+        self._recorder = cassette
         return self
 
     @property
@@ -330,10 +551,9 @@ class Route:
         self, effect: CallableSideEffect, request: httpx.Request, **kwargs: Any
     ) -> RouteResultTypes:
         # Add route kwarg if the side effect wants it
-        argspec = inspect.getfullargspec(effect)
         if "route" in kwargs:
             warn(f"Matched context contains reserved word `route`: {self.pattern!r}")
-        if "route" in argspec.args:
+        if "route" in get_arg_names(effect):
             kwargs["route"] = self
 
         try:
@@ -393,6 +613,10 @@ class Route:
             if result is None:
                 return None  # Side effect resolved as a non-matching route
 
+        elif self._response_template is not None:
+            # Render frozen response, i.e. no need to clone
+            return self._response_template.render(request)
+
         elif self._return_value:
             result = self._return_value
 
@@ -422,6 +646,11 @@ class Route:
             context = match.context
 
         if self._pass_through:
+            if self._recorder is not None:
+                # Replay any recorded response, else pass through to record it
+                response = self._recorder(request)
+                if response is not None:
+                    return response
             return request
 
         result = self.resolve(request, **context)
@@ -469,10 +698,12 @@ class RouteList:
             raise TypeError("Can't slice assign routes")
         self._routes = list(routes._routes)
         self._names = dict(routes._names)
+        Route._generation += 1
 
     def clear(self) -> None:
         self._routes.clear()
         self._names.clear()
+        Route._generation += 1
 
     def add(self, route: Route, name: Optional[str] = None) -> Route:
         # Find route with same name
@@ -500,6 +731,9 @@ class RouteList:
             existing_route.return_value = route.return_value
             existing_route.side_effect = route.side_effect
             existing_route.pass_through(route.is_pass_through)
+            existing_route._recorder = route._recorder
+            existing_route._delay = route._delay
+            existing_route._bandwidth = route._bandwidth
             route = existing_route
         else:
             # Add new route
@@ -509,6 +743,7 @@ class RouteList:
             route._name = name
             self._names[name] = route
 
+        Route._generation += 1
         return route
 
     def pop(self, name, default=...):
@@ -520,6 +755,7 @@ class RouteList:
         try:
             route = self._names.pop(name)
             self._routes.remove(route)
+            Route._generation += 1
             return route
         except KeyError as ex:
             if default is ...:
@@ -548,3 +784,4 @@ class ResolvedRoute:
     def __init__(self):
         self.route: Optional[Route] = None
         self.response: Optional[ResolvedResponseTypes] = None
+        self.delay: float = 0.0
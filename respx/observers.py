@@ -0,0 +1,101 @@
+import threading
+from collections import Counter
+from typing import TYPE_CHECKING, List, NamedTuple, Optional
+
+import httpx
+
+if TYPE_CHECKING:
+    from .models import Route  # pragma: nocover
+    from .types import ResolvedResponseTypes  # pragma: nocover
+
+
+class ResolveEvent(NamedTuple):
+    """
+    Router resolve event, timed in monotonic nanoseconds.
+
+    The resolved route and response are `None` until resolved, and on a miss,
+    where the response is also `None` when a side effect raised.
+    """
+
+    request: httpx.Request
+    started_ns: int
+    elapsed_ns: int = 0
+    routes_evaluated: int = 0
+    route: Optional["Route"] = None
+    response: Optional["ResolvedResponseTypes"] = None
+
+
+class Observer:
+    """
+    Base router observer, with no-op callbacks to override.
+
+    Register with `router.observe(observer)`.
+    """
+
+    def on_resolve_start(self, event: ResolveEvent) -> None:
+        pass
+
+    def on_route_match(self, event: ResolveEvent) -> None:
+        pass
+
+    def on_miss(self, event: ResolveEvent) -> None:
+        pass
+
+    def on_pass_through(self, event: ResolveEvent) -> None:
+        pass
+
+
+class ResolveStats(Observer):
+    """
+    Observer aggregating resolve latencies and per route hit counts.
+    """
+
+    def __init__(self) -> None:
+        self.elapsed_ns: List[int] = []
+        self.hits: "Counter[str]" = Counter()
+        self.misses = 0
+        self.pass_throughs = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.elapsed_ns)
+
+    def percentile(self, percent: float) -> int:
+        """
+        Returns the nearest-rank percentile resolve latency, in nanoseconds.
+        """
+        if not self.elapsed_ns:
+            return 0
+        elapsed_ns = sorted(self.elapsed_ns)
+        rank = max(-(-len(elapsed_ns) * percent // 100), 1)
+        return elapsed_ns[int(rank) - 1]
+
+    @property
+    def p50(self) -> int:
+        return self.percentile(50)
+
+    @property
+    def p99(self) -> int:
+        return self.percentile(99)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.elapsed_ns.clear()
+            self.hits.clear()
+            self.misses = self.pass_throughs = 0
+
+    def on_route_match(self, event: ResolveEvent) -> None:
+        assert event.route is not None
+        with self._lock:
+            self.elapsed_ns.append(event.elapsed_ns)
+            self.hits[event.route.name or repr(event.route)] += 1
+
+    def on_miss(self, event: ResolveEvent) -> None:
+        with self._lock:
+            self.elapsed_ns.append(event.elapsed_ns)
+            self.misses += 1
+
+    def on_pass_through(self, event: ResolveEvent) -> None:
+        self.on_route_match(event)
+        with self._lock:
+            self.pass_throughs += 1
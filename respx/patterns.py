@@ -6,13 +6,13 @@ import re
 from abc import ABC
 from enum import Enum
 from functools import reduce
-from http.cookies import SimpleCookie
 from types import MappingProxyType
 from typing import (
     Any,
     Callable,
     ClassVar,
     Dict,
+    FrozenSet,
     List,
     Mapping,
     Optional,
@@ -22,13 +22,22 @@ from typing import (
     Tuple,
     Type,
     Union,
+    cast,
 )
 from unittest.mock import ANY
 from urllib.parse import urljoin
 
 import httpx
 
-from respx.utils import MultiItems, decode_data
+from respx.utils import (
+    DIGEST_MIN_SIZE,
+    Digest,
+    MultiItems,
+    URLComponents,
+    decode_data,
+    get_content_digest,
+    get_files_digests,
+)
 
 from .types import (
     URL as RawURL,
@@ -68,6 +77,7 @@ class Match:
 class Pattern(ABC):
     key: ClassVar[str]
     lookups: ClassVar[Tuple[Lookup, ...]] = (Lookup.EQUAL,)
+    reads_content: ClassVar[bool] = False  # Whether parse needs the request body
 
     lookup: Lookup
     base: Optional["Pattern"]
@@ -344,6 +354,13 @@ class Cookies(Pattern):
     def __hash__(self):
         return hash((self.__class__, self.lookup, tuple(sorted(self.value))))
 
+    def __getstate__(self) -> Dict[str, Any]:
+        # Pickle cookies sorted, i.e. not in hash seed order, for stable dump keys
+        return {**self.__dict__, "value": sorted(self.value)}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state, value=set(state["value"]))
+
     def clean(self, value: CookieTypes) -> Set[Tuple[str, str]]:
         if isinstance(value, dict):
             return set(value.items())
@@ -357,6 +374,8 @@ class Cookies(Pattern):
         if not cookie_header:
             return set()
 
+        from http.cookies import SimpleCookie
+
         cookies: SimpleCookie = SimpleCookie()
         cookies.load(rawdata=cookie_header)
 
@@ -380,7 +399,7 @@ class Scheme(Pattern):
         return value
 
     def parse(self, request: httpx.Request) -> str:
-        return request.url.scheme
+        return get_url_components(request).scheme
 
 
 class Host(Pattern):
@@ -396,7 +415,7 @@ class Host(Pattern):
         return value
 
     def parse(self, request: httpx.Request) -> str:
-        return request.url.host
+        return get_url_components(request).host
 
 
 class Port(Pattern):
@@ -405,8 +424,9 @@ class Port(Pattern):
     value: Optional[int]
 
     def parse(self, request: httpx.Request) -> Optional[int]:
-        scheme = request.url.scheme
-        port = request.url.port
+        url = get_url_components(request)
+        scheme = url.scheme
+        port = url.port
         scheme_port = get_scheme_port(scheme)
         return port or scheme_port
 
@@ -436,7 +456,7 @@ class Path(Pattern):
         return value
 
     def parse(self, request: httpx.Request) -> str:
-        return request.url.path
+        return get_url_components(request).path
 
     def strip_base(self, value: str) -> str:
         if self.base:
@@ -493,6 +513,8 @@ class URL(Pattern):
 
 
 class ContentMixin:
+    reads_content = True
+
     def parse(self, request: httpx.Request) -> Any:
         content = request.read()
         return content
@@ -501,15 +523,23 @@ class ContentMixin:
 class Content(ContentMixin, Pattern):
     lookups = (Lookup.EQUAL, Lookup.CONTAINS)
     key = "content"
-    value: bytes
+    value: Union[bytes, Digest]
 
-    def clean(self, value: Union[bytes, str]) -> bytes:
+    def clean(self, value: Union[bytes, str]) -> Union[bytes, Digest]:
         if isinstance(value, str):
-            return value.encode()
+            value = value.encode()
+        if self.lookup is Lookup.EQUAL and len(value) >= DIGEST_MIN_SIZE:
+            # Keep large content as digest, compared by length before hashing
+            return Digest.of(value)
         return value
 
+    def parse(self, request: httpx.Request) -> Any:
+        if isinstance(self.value, Digest):
+            return get_content_digest(request)
+        return super().parse(request)
+
     def _contains(self, value: Union[bytes, str]) -> Match:
-        return Match(self.value in value)
+        return Match(self.value in value)  # type: ignore[operator]
 
 
 class JSON(ContentMixin, PathPattern):
@@ -547,6 +577,7 @@ class Data(MultiItemsMixin, Pattern):
     lookups = (Lookup.EQUAL, Lookup.CONTAINS)
     key = "data"
     value: MultiItems
+    reads_content = True
 
     def clean(self, value: Dict) -> MultiItems:
         return MultiItems(
@@ -562,6 +593,7 @@ class Files(MultiItemsMixin, Pattern):
     lookups = (Lookup.CONTAINS, Lookup.EQUAL)
     key = "files"
     value: MultiItems
+    reads_content = True
 
     def _normalize_file_value(self, value: FileTypes) -> Tuple[Any, Any]:
         # Mimic httpx `FileField` to normalize `files` kwarg to shortest tuple style
@@ -580,6 +612,10 @@ class Files(MultiItemsMixin, Pattern):
         elif isinstance(fileobj, str):
             fileobj = fileobj.encode()
 
+        # Keep large files as digests, compared by length before hashing
+        if isinstance(fileobj, bytes) and len(fileobj) >= DIGEST_MIN_SIZE:
+            return filename, Digest.of(fileobj)
+
         return filename, fileobj
 
     def clean(self, value: RequestFiles) -> MultiItems:
@@ -592,6 +628,8 @@ class Files(MultiItemsMixin, Pattern):
         return files
 
     def parse(self, request: httpx.Request) -> Any:
+        if any(isinstance(value[1], Digest) for value in self.value.values()):
+            return get_files_digests(request)
         _, files = decode_data(request)
         return files
 
@@ -642,6 +680,32 @@ def M(*patterns: Pattern, **lookups: Any) -> Pattern:
     return combined_pattern
 
 
+def get_url_components(
+    request: httpx.Request,
+) -> Union[URLComponents, httpx.URL]:
+    """
+    Returns parsed url components, straight from the request when it has them,
+    i.e. without parsing the full url of a lazy request.
+    """
+    return getattr(request, "url_components", None) or request.url
+
+
+def get_hosts(pattern: Pattern) -> Optional[FrozenSet[str]]:
+    """
+    Returns the hosts given pattern can only match, if required, else `None`.
+    """
+    if isinstance(pattern, _And):
+        a, b = pattern.value
+        hosts = get_hosts(a)
+        return hosts if hosts is not None else get_hosts(b)
+    if isinstance(pattern, Host):
+        if pattern.lookup is Lookup.EQUAL:
+            return frozenset((cast(str, pattern.value),))
+        if pattern.lookup is Lookup.IN:
+            return frozenset(cast(Sequence[str], pattern.value))
+    return None
+
+
 def get_scheme_port(scheme: Optional[str]) -> Optional[int]:
     return {"http": 80, "https": 443}.get(scheme or "")
 
@@ -1,3 +1,4 @@
+from contextlib import ExitStack
 from typing import cast
 
 import pytest
@@ -28,3 +29,29 @@ def respx_mock(request):
 
     with mock_router:
         yield mock_router
+
+
+@pytest.fixture(scope="session")
+def respx_session_mock():
+    """
+    Session scoped router, to build routes once, isolated per test using it.
+    """
+    return MockRouter(assert_all_called=False)
+
+
+@pytest.fixture(scope="module")
+def respx_module_mock():
+    """
+    Module scoped router, to build routes once, isolated per test using it.
+    """
+    return MockRouter(assert_all_called=False)
+
+
+@pytest.fixture(autouse=True)
+def _respx_isolation(request):
+    # Start any shared router per test, i.e. snapshot and rollback its routes and calls
+    with ExitStack() as stack:
+        for name in ("respx_session_mock", "respx_module_mock"):
+            if name in request.fixturenames:
+                stack.enter_context(request.getfixturevalue(name))
+        yield
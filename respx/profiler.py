@@ -0,0 +1,150 @@
+import json
+import time
+from types import TracebackType
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Set, Type
+
+import httpx
+
+if TYPE_CHECKING:
+    from .router import Router  # pragma: nocover
+
+
+class ProfileStats:
+    """
+    Evaluation counts and cumulative time, in nanoseconds, of a route or pattern.
+    """
+
+    __slots__ = ("evaluations", "matches", "elapsed_ns", "miss_ns")
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.evaluations = 0
+        self.matches = 0
+        self.elapsed_ns = 0
+        self.miss_ns = 0
+
+    @property
+    def match_rate(self) -> float:
+        return self.matches / self.evaluations if self.evaluations else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "evaluations": self.evaluations,
+            "matches": self.matches,
+            "match_rate": self.match_rate,
+            "elapsed_ns": self.elapsed_ns,
+            "miss_ns": self.miss_ns,
+        }
+
+
+class Profiler:
+    """
+    Profiles evaluations of a router's routes, and their leaf patterns by key and
+    lookup, while started.
+
+    The `match` method of each route, and pattern, present when started is wrapped
+    on the instance, and restored when stopped, i.e. routes are not profiled
+    otherwise, and routes added while profiling are not profiled.
+    """
+
+    def __init__(self, router: "Router") -> None:
+        self.router = router
+        self.routes: Dict[str, ProfileStats] = {}
+        self.patterns: Dict[str, ProfileStats] = {}
+        self._profiled: List[Any] = []
+
+    def __enter__(self) -> "Profiler":
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]] = None,
+        exc_value: Optional[BaseException] = None,
+        traceback: Optional[TracebackType] = None,
+    ) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        profiled: Set[int] = {id(obj) for obj in self._profiled}
+        for route in self.router.routes:
+            if id(route) not in profiled:
+                name = route.name or repr(route)
+                self._profile(route, self.routes.setdefault(name, ProfileStats()))
+                profiled.add(id(route))
+
+            for pattern in route.pattern:
+                key = getattr(pattern, "key", None)
+                if key is None or id(pattern) in profiled:
+                    continue  # Noop, or shared, pattern
+                name = f"{key}__{pattern.lookup.value}"
+                self._profile(pattern, self.patterns.setdefault(name, ProfileStats()))
+                profiled.add(id(pattern))
+
+    def stop(self) -> None:
+        while self._profiled:
+            vars(self._profiled.pop()).pop("match", None)
+
+    def _profile(self, obj: Any, stats: ProfileStats) -> None:
+        match: Callable[[httpx.Request], Any] = obj.match
+        perf_counter_ns = time.perf_counter_ns
+
+        def profiled_match(request: httpx.Request) -> Any:
+            started_ns = perf_counter_ns()
+            result = match(request)
+            elapsed_ns = perf_counter_ns() - started_ns
+            stats.evaluations += 1
+            stats.elapsed_ns += elapsed_ns
+            # Routes resolve to None on a miss, while patterns return a falsy Match
+            if result is not None and result:
+                stats.matches += 1
+            else:
+                stats.miss_ns += elapsed_ns
+            return result
+
+        obj.match = profiled_match
+        self._profiled.append(obj)
+
+    def reset(self) -> None:
+        for stats in (*self.routes.values(), *self.patterns.values()):
+            stats.reset()
+
+    def as_dict(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        return {
+            "routes": {name: s.as_dict() for name, s in self.routes.items()},
+            "patterns": {name: s.as_dict() for name, s in self.patterns.items()},
+        }
+
+    def to_json(self, **kwargs: Any) -> str:
+        return json.dumps(self.as_dict(), **kwargs)
+
+    def report(self, limit: int = 10) -> str:
+        """
+        Returns a text report of the most expensive routes and patterns, and the
+        ones spending the most time not matching, e.g. to reorder or narrow.
+        """
+        lines = []
+        for title, stats in (("Routes", self.routes), ("Patterns", self.patterns)):
+            for order, attr in (("cumulative", "elapsed_ns"), ("missing", "miss_ns")):
+                ranked = sorted(
+                    stats.items(), key=lambda item: getattr(item[1], attr), reverse=True
+                )[:limit]
+                lines.append(f"{title} by {order} time:")
+                lines.append(
+                    f"{'evals':>10} {'matches':>10} {'match%':>7} "
+                    f"{'total ms':>10} {'miss ms':>10} {'us/eval':>9}  name"
+                )
+                for name, s in ranked:
+                    per_eval_us = (
+                        s.elapsed_ns / s.evaluations / 1e3 if s.evaluations else 0
+                    )
+                    lines.append(
+                        f"{s.evaluations:>10} {s.matches:>10} {s.match_rate:>7.1%} "
+                        f"{s.elapsed_ns / 1e6:>10.3f} {s.miss_ns / 1e6:>10.3f} "
+                        f"{per_eval_us:>9.2f}  {name}"
+                    )
+                lines.append("")
+
+        return "\n".join(lines)
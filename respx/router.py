@@ -1,4 +1,10 @@
+import gc
+import hashlib
 import inspect
+import os
+import pickle
+import tempfile
+import time
 from contextlib import contextmanager
 from functools import partial, update_wrapper, wraps
 from types import TracebackType
@@ -12,6 +18,7 @@ from typing import (
     Optional,
     Tuple,
     Type,
+    TypeVar,
     Union,
     cast,
     overload,
@@ -19,6 +26,7 @@ from typing import (
 
 import httpx
 
+from .har import HAR
 from .mocks import Mocker
 from .models import (
     AllMockedAssertionError,
@@ -29,12 +37,31 @@ from .models import (
     RouteList,
     SideEffectError,
 )
+from .observers import Observer, ResolveEvent
 from .patterns import Pattern, merge_patterns, parse_url_patterns
+from .profiler import Profiler
+from .shared import SharedCallCounts
+from .timing import (
+    Clock,
+    Delay,
+    DelayTypes,
+    VirtualClock,
+    parse_bandwidth,
+    parse_delay,
+    throttle_response,
+)
 from .types import DefaultType, ResolvedResponseTypes, RouteResultTypes, URLPatternTypes
+from .utils import get_arg_names
 
 Default = NewType("Default", object)
 DEFAULT = Default(...)
 
+RouterType = TypeVar("RouterType", bound="Router")
+ObserverType = TypeVar("ObserverType", bound=Observer)
+
+# Header of serialized route tables, followed by the sha256 hex digest of the payload
+DUMP_HEADER = b"RESPX-ROUTES/1\n"
+
 
 class Router:
     def __init__(
@@ -43,10 +70,19 @@ class Router:
         assert_all_called: bool = True,
         assert_all_mocked: bool = True,
         base_url: Optional[str] = None,
+        delay: Optional[DelayTypes] = None,
+        bandwidth: Optional[float] = None,
     ) -> None:
         self._assert_all_called = assert_all_called
         self._assert_all_mocked = assert_all_mocked
         self._bases = parse_url_patterns(base_url, exact=False)
+        self._delay: Optional[Delay] = parse_delay(delay)
+        self._bandwidth: Optional[float] = parse_bandwidth(bandwidth)
+        self.clock: Clock = Clock()
+        self._observers: Tuple[Observer, ...] = ()
+        self._shared: Optional[SharedCallCounts] = None
+        self._gc_frozen = False
+        self._reads_content: Tuple[int, bool] = (-1, False)
 
         self.routes = RouteList()
         self.calls = CallList()
@@ -66,7 +102,7 @@ class Router:
         """
         # Snapshot current routes and calls
         routes = RouteList(self.routes)
-        calls = CallList(self.calls)
+        calls = tuple(self.calls)
         self._snapshots.append((routes, calls))
 
         # Snapshot each route state
@@ -97,8 +133,160 @@ class Router:
         for route in self.routes:
             route.reset()
 
+    def dump(self, path: Union[str, "os.PathLike[str]"]) -> str:
+        """
+        Serializes routes to given file, returning its content hash as cache key.
+
+        Only static routes are serializable, i.e. patterns, names and frozen
+        responses, not side effects.
+        """
+        payload = pickle.dumps(tuple(self.routes), protocol=pickle.HIGHEST_PROTOCOL)
+        key = hashlib.sha256(payload).hexdigest()
+
+        # Write to a temporary file, atomically replacing any existing one
+        directory = os.path.dirname(os.path.abspath(path))
+        with tempfile.NamedTemporaryFile(dir=directory, delete=False) as f:
+            f.write(DUMP_HEADER + key.encode("ascii") + b"\n" + payload)
+        os.replace(f.name, path)
+
+        return key
+
+    @classmethod
+    def load(
+        cls: Type[RouterType],
+        path: Union[str, "os.PathLike[str]"],
+        *,
+        key: Optional[str] = None,
+        **settings: Any,
+    ) -> RouterType:
+        """
+        Creates a router, with given settings, from routes serialized by `.dump()`.
+
+        Raises `ValueError` if the file is corrupt, or not matching given cache key.
+        """
+        with open(path, "rb") as f:
+            header = f.read(len(DUMP_HEADER))
+            digest = f.read(65).rstrip(b"\n").decode("ascii", errors="replace")
+            payload = f.read()
+
+        if header != DUMP_HEADER or hashlib.sha256(payload).hexdigest() != digest:
+            raise ValueError(f"Invalid or corrupt respx routes file: {path!r}")
+        if key is not None and key != digest:
+            raise ValueError(f"Stale respx routes file {path!r}, expected key {key!r}")
+
+        router = cls(**settings)
+        for route in pickle.loads(payload):
+            router.routes.add(route, name=route.name)  # Base url already merged
+        router.snapshot()
+        return router
+
+    def observe(self, observer: ObserverType) -> ObserverType:
+        """
+        Registers an observer of resolve events, e.g. a `ResolveStats` aggregator.
+        """
+        self._observers += (observer,)
+        return observer
+
+    def unobserve(self, observer: Observer) -> None:
+        self._observers = tuple(o for o in self._observers if o is not observer)
+
+    def profile(self) -> Profiler:
+        """
+        Returns a profiler of this router's current routes and patterns, to start,
+        e.g. `with router.profile() as profiler: ...`.
+        """
+        return Profiler(self)
+
+    def _notify(
+        self,
+        request: httpx.Request,
+        started_ns: int,
+        route: Optional[Route],
+        response: Optional[ResolvedResponseTypes],
+    ) -> None:
+        elapsed_ns = time.monotonic_ns() - started_ns
+        if route is None:
+            callback, routes_evaluated = "on_miss", len(self.routes)
+        else:
+            callback = "on_pass_through" if response is request else "on_route_match"
+            routes_evaluated = next(
+                (i for i, r in enumerate(self.routes, 1) if r is route),
+                len(self.routes),
+            )
+
+        event = ResolveEvent(
+            request, started_ns, elapsed_ns, routes_evaluated, route, response
+        )
+        for observer in self._observers:
+            getattr(observer, callback)(event)
+
+    def load_har(
+        self,
+        path: Union[str, "os.PathLike[str]"],
+        *patterns: Pattern,
+        name: Optional[str] = None,
+        **lookups: Any,
+    ) -> Route:
+        """
+        Adds a route, with optionally given name and patterns, replaying responses
+        recorded in given HAR file, by request method and url.
+
+        Raises `ValueError` if the file is not valid HAR.
+        """
+        return self.route(*patterns, name=name, **lookups).mock(side_effect=HAR(path))
+
+    @property
+    def reads_content(self) -> bool:
+        """
+        Whether any route may need the request body, cached until routes change.
+        """
+        generation, reads_content = self._reads_content
+        if generation != Route._generation:
+            generation = Route._generation
+            reads_content = any(route.reads_content for route in self.routes)
+            self._reads_content = (generation, reads_content)
+        return reads_content
+
+    def freeze(self, *, workers: int = 64) -> None:
+        """
+        Freezes current routes, to share copy-on-write with forked worker processes.
+
+        Tracked objects are moved to the garbage collector's permanent generation,
+        i.e. not dirtying shared pages when collecting, and calls in forked workers
+        are only counted, in shared memory, merged by `.call_count(route)`.
+
+        Note that the garbage collector freeze is process-wide, i.e. applies to all
+        tracked objects, not only this router's.
+        """
+        self._shared = SharedCallCounts(self.routes, slots=workers)
+        # Only unfreeze the garbage collector later, if not already frozen elsewhere
+        self._gc_frozen = self._gc_frozen or not gc.get_freeze_count()
+        gc.collect()
+        gc.freeze()
+
+    def unfreeze(self) -> None:
+        """
+        Unfreezes routes, dropping forked call counts, and the garbage collector,
+        if frozen by this router.
+        """
+        if self._gc_frozen:
+            gc.unfreeze()
+            self._gc_frozen = False
+        self._shared = None
+
+    def call_count(self, route: Route) -> int:
+        """
+        Returns the call count of given route, including forked worker calls.
+        """
+        count = route.call_count
+        if self._shared is not None:
+            count += self._shared.call_count(route)
+        return count
+
     def assert_all_called(self) -> None:
-        not_called_routes = [route for route in self.routes if not route.called]
+        not_called_routes = [
+            route for route in self.routes if not self.call_count(route)
+        ]
         assert not_called_routes == [], "RESPX: some routes were not called!"
 
     def __getitem__(self, name: str) -> Route:
@@ -233,20 +421,56 @@ class Router:
         response: Optional[httpx.Response] = None,
         route: Optional[Route] = None,
     ) -> None:
+        if self._shared is not None and self._shared.count_call(route):
+            return  # Only counted, in a forked worker process
+
         call = self.calls.record(request, response)
         if route:
             route.calls.append(call)
 
+    def _sample_delay(self, route: Optional[Route] = None) -> float:
+        """
+        Samples seconds to delay a response, or exception, from given route.
+        """
+        delay = route._delay if route and route._delay else self._delay
+        return delay.sample() if delay else 0.0
+
+    def _shape(
+        self, response: httpx.Response, route: Optional[Route] = None
+    ) -> httpx.Response:
+        """
+        Throttles given mocked response to the route's, or router's, bandwidth.
+        """
+        bandwidth = route._bandwidth if route and route._bandwidth else self._bandwidth
+        if not bandwidth:
+            return response
+        return throttle_response(response, bandwidth, clock=self.clock)
+
     @contextmanager
-    def resolver(self, request: httpx.Request) -> Generator[ResolvedRoute, None, None]:
+    def resolver(
+        self, request: httpx.Request, *, quiet: bool = False
+    ) -> Generator[ResolvedRoute, None, None]:
         resolved = ResolvedRoute()
 
+        # Only time resolving when observed
+        observed = bool(self._observers)
+        if observed:
+            started_ns = time.monotonic_ns()
+            for observer in self._observers:
+                observer.on_resolve_start(ResolveEvent(request, started_ns))
+
         try:
             yield resolved
 
+            if observed:
+                self._notify(request, started_ns, resolved.route, resolved.response)
+
             if resolved.route is None:
                 # Assert we always get a route match, if check is enabled
                 if self._assert_all_mocked:
+                    if quiet:
+                        # Leave unresolved, and unrecorded, for caller to assert
+                        return
                     raise AllMockedAssertionError(f"RESPX: {request!r} not mocked!")
 
                 # Auto mock a successful empty response
@@ -254,6 +478,10 @@ class Router:
 
             elif resolved.response == request:
                 # Pass-through request
+                if quiet:
+                    # Signal pass-through by the resolved request, i.e. no raise
+                    self.record(request, response=None, route=resolved.route)
+                    return
                 raise PassThrough(
                     f"Request marked to pass through: {request!r}",
                     request=request,
@@ -264,8 +492,15 @@ class Router:
                 # Mocked response
                 assert isinstance(resolved.response, httpx.Response)
 
+            # Shape mocked response latency and bandwidth
+            resolved.delay = self._sample_delay(resolved.route)
+            resolved.response = self._shape(resolved.response, resolved.route)
+
         except SideEffectError as error:
+            if observed:
+                self._notify(request, started_ns, error.route, None)
             self.record(request, response=None, route=error.route)
+            resolved.delay = self._sample_delay(error.route)
             raise error.origin from error
         except PassThrough:
             self.record(request, response=None, route=resolved.route)
@@ -273,38 +508,56 @@ class Router:
         else:
             self.record(request, response=resolved.response, route=resolved.route)
 
-    def resolve(self, request: httpx.Request) -> ResolvedRoute:
-        with self.resolver(request) as resolved:
-            for route in self.routes:
-                prospect = route.match(request)
-                if prospect is not None:
-                    resolved.route = route
-                    resolved.response = cast(ResolvedResponseTypes, prospect)
-                    break
+    def resolve(self, request: httpx.Request, *, quiet: bool = False) -> ResolvedRoute:
+        # Bound before entering, i.e. if an observer raises when resolving starts
+        resolved = ResolvedRoute()
+        try:
+            with self.resolver(request, quiet=quiet) as resolved:
+                for route in self.routes:
+                    prospect = route.match(request)
+                    if prospect is not None:
+                        resolved.route = route
+                        resolved.response = cast(ResolvedResponseTypes, prospect)
+                        break
+        finally:
+            if resolved.delay:
+                self.clock.sleep(resolved.delay)
 
-        if resolved.response and isinstance(resolved.response.stream, httpx.ByteStream):
+        if isinstance(resolved.response, httpx.Response) and isinstance(
+            resolved.response.stream, httpx.ByteStream
+        ):
             resolved.response.read()  # Pre-read stream
 
         return resolved
 
-    async def aresolve(self, request: httpx.Request) -> ResolvedRoute:
-        with self.resolver(request) as resolved:
-            for route in self.routes:
-                prospect: RouteResultTypes = route.match(request)
-
-                # Await async side effect and wrap any exception
-                if inspect.isawaitable(prospect):
-                    try:
-                        prospect = await prospect
-                    except Exception as error:
-                        raise SideEffectError(route, origin=error) from error
-
-                if prospect is not None:
-                    resolved.route = route
-                    resolved.response = cast(ResolvedResponseTypes, prospect)
-                    break
+    async def aresolve(
+        self, request: httpx.Request, *, quiet: bool = False
+    ) -> ResolvedRoute:
+        # Bound before entering, i.e. if an observer raises when resolving starts
+        resolved = ResolvedRoute()
+        try:
+            with self.resolver(request, quiet=quiet) as resolved:
+                for route in self.routes:
+                    prospect: RouteResultTypes = route.match(request)
+
+                    # Await async side effect and wrap any exception
+                    if inspect.isawaitable(prospect):
+                        try:
+                            prospect = await prospect
+                        except Exception as error:
+                            raise SideEffectError(route, origin=error) from error
+
+                    if prospect is not None:
+                        resolved.route = route
+                        resolved.response = cast(ResolvedResponseTypes, prospect)
+                        break
+        finally:
+            if resolved.delay:
+                await self.clock.asleep(resolved.delay)
 
-        if resolved.response and isinstance(resolved.response.stream, httpx.ByteStream):
+        if isinstance(resolved.response, httpx.Response) and isinstance(
+            resolved.response.stream, httpx.ByteStream
+        ):
             await resolved.response.aread()  # Pre-read stream
 
         return resolved
@@ -328,14 +581,23 @@ class MockRouter(Router):
         assert_all_mocked: bool = True,
         base_url: Optional[str] = None,
         using: Optional[Union[str, Default]] = DEFAULT,
+        delay: Optional[DelayTypes] = None,
+        bandwidth: Optional[float] = None,
+        virtual_time: bool = False,
+        context_local: bool = False,
     ) -> None:
         super().__init__(
             assert_all_called=assert_all_called,
             assert_all_mocked=assert_all_mocked,
             base_url=base_url,
+            delay=delay,
+            bandwidth=bandwidth,
         )
         self.Mocker: Optional[Type[Mocker]] = None
         self._using = using
+        self._context_local = context_local
+        if virtual_time:
+            self.clock = VirtualClock()
 
     @overload
     def __call__(
@@ -346,6 +608,10 @@ class MockRouter(Router):
         assert_all_mocked: Optional[bool] = None,
         base_url: Optional[str] = None,
         using: Optional[Union[str, Default]] = DEFAULT,
+        delay: Optional[DelayTypes] = None,
+        bandwidth: Optional[float] = None,
+        virtual_time: Optional[bool] = None,
+        context_local: Optional[bool] = None,
     ) -> "MockRouter":
         ...  # pragma: nocover
 
@@ -358,6 +624,10 @@ class MockRouter(Router):
         assert_all_mocked: Optional[bool] = None,
         base_url: Optional[str] = None,
         using: Optional[Union[str, Default]] = DEFAULT,
+        delay: Optional[DelayTypes] = None,
+        bandwidth: Optional[float] = None,
+        virtual_time: Optional[bool] = None,
+        context_local: Optional[bool] = None,
     ) -> Callable:
         ...  # pragma: nocover
 
@@ -369,6 +639,10 @@ class MockRouter(Router):
         assert_all_mocked: Optional[bool] = None,
         base_url: Optional[str] = None,
         using: Optional[Union[str, Default]] = DEFAULT,
+        delay: Optional[DelayTypes] = None,
+        bandwidth: Optional[float] = None,
+        virtual_time: Optional[bool] = None,
+        context_local: Optional[bool] = None,
     ) -> Union["MockRouter", Callable]:
         """
         Decorator or Context Manager.
@@ -384,18 +658,23 @@ class MockRouter(Router):
             settings: Dict[str, Any] = {
                 "base_url": base_url,
                 "using": using,
+                "delay": delay,
+                "bandwidth": bandwidth,
             }
             if assert_all_called is not None:
                 settings["assert_all_called"] = assert_all_called
             if assert_all_mocked is not None:
                 settings["assert_all_mocked"] = assert_all_mocked
+            if virtual_time is not None:
+                settings["virtual_time"] = virtual_time
+            if context_local is not None:
+                settings["context_local"] = context_local
             respx_mock = self.__class__(**settings)
             return respx_mock
 
         # Determine if decorated function needs a `respx_mock` instance
         is_async = inspect.iscoroutinefunction(func)
-        argspec = inspect.getfullargspec(func)
-        needs_mock_reference = "respx_mock" in argspec.args
+        needs_mock_reference = "respx_mock" in get_arg_names(func)
 
         if needs_mock_reference:
             func = partial(func, respx_mock=self)
@@ -462,9 +741,11 @@ class MockRouter(Router):
         Register transport, snapshot router and start patching.
         """
         self.snapshot()
+        if isinstance(self.clock, VirtualClock):
+            self.clock.start()
         self.Mocker = Mocker.registry.get(self.using or "")
         if self.Mocker:
-            self.Mocker.register(self)
+            self.Mocker.register(self, context_local=self._context_local)
             self.Mocker.start()
 
     def stop(self, clear: bool = True, reset: bool = True, quiet: bool = False) -> None:
@@ -484,3 +765,5 @@ class MockRouter(Router):
                 self.reset()
             if self.Mocker:
                 self.Mocker.stop()
+            if isinstance(self.clock, VirtualClock):
+                self.clock.stop()
@@ -0,0 +1,63 @@
+from typing import Any, Iterator, Tuple
+
+from .types import SideEffectListTypes
+
+Run = Tuple[SideEffectListTypes, Any]
+
+
+class SideEffectSequence(Iterator[SideEffectListTypes]):
+    """
+    Run-length encoded iterator of side effects, given as `(effect, count)` runs,
+    where a count of `...` repeats the effect forever.
+
+    Only the position is state, i.e. copied in constant time when snapshotted.
+    """
+
+    __slots__ = ("runs", "cycle", "_index", "_used")
+
+    def __init__(self, runs: Tuple[Run, ...], *, cycle: bool = False) -> None:
+        if not runs:
+            raise ValueError("Side effect sequence needs at least one run")
+        for i, (effect, count) in enumerate(runs):
+            if count is Ellipsis:
+                if i < len(runs) - 1:
+                    raise ValueError("Only the last run can repeat forever")
+            elif not isinstance(count, int) or count < 1:
+                raise ValueError(f"Invalid run count {count!r} of {effect!r}")
+        self.runs = runs
+        self.cycle = cycle
+        self._index = 0
+        self._used = 0
+
+    def __repr__(self) -> str:  # pragma: nocover
+        return f"<SideEffectSequence runs={self.runs!r} cycle={self.cycle!r}>"
+
+    def __copy__(self) -> "SideEffectSequence":
+        clone = SideEffectSequence.__new__(SideEffectSequence)
+        clone.runs = self.runs
+        clone.cycle = self.cycle
+        clone._index = self._index
+        clone._used = self._used
+        return clone
+
+    def __next__(self) -> SideEffectListTypes:
+        if self._index == len(self.runs):
+            if not self.cycle:
+                raise StopIteration
+            self._index = 0
+
+        effect, count = self.runs[self._index]
+        if count is not Ellipsis:
+            self._used += 1
+            if self._used == count:
+                self._index += 1
+                self._used = 0
+        return effect
+
+
+def sequence(*runs: Run, cycle: bool = False) -> SideEffectSequence:
+    """
+    Returns a compact side effect iterator, of `(effect, count)` runs, e.g.
+    `sequence((httpx.Response(500), 3), (httpx.Response(200), ...))`.
+    """
+    return SideEffectSequence(runs, cycle=cycle)
@@ -0,0 +1,253 @@
+import asyncio
+import threading
+from types import TracebackType
+from typing import TYPE_CHECKING, List, Optional, Set, Tuple, Type
+
+import httpx
+
+from .models import AllMockedAssertionError, PassThrough
+
+if TYPE_CHECKING:
+    from .router import Router  # pragma: nocover
+
+# Response headers replaced, once the response body is read
+REPLACED_HEADERS = {b"connection", b"content-length", b"transfer-encoding"}
+
+
+class BadRequest(Exception):
+    pass
+
+
+class Server:
+    """
+    Local HTTP/1.1 server, answering requests with responses resolved by a router,
+    e.g. for clients in subprocesses, or not using HTTPX, where patching can't reach.
+
+    Start within a running event loop with `async with`, or in a background thread,
+    with its own event loop, with `with`.
+    """
+
+    def __init__(
+        self, router: "Router", *, host: str = "127.0.0.1", port: int = 0
+    ) -> None:
+        self.router = router
+        self.host = host
+        self.port = port
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._handlers: Set["asyncio.Task[None]"] = set()
+
+    @property
+    def url(self) -> httpx.URL:
+        return httpx.URL(scheme="http", host=self.host, port=self.port, path="/")
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            # Stop handling open, e.g. idle keep-alive, connections, closing them,
+            # else waited for by `wait_closed()`, or pending when closing the loop
+            handlers = list(self._handlers)
+            for handler in handlers:
+                handler.cancel()
+            await asyncio.gather(*handlers, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> "Server":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args: object) -> None:
+        await self.stop()
+
+    def __enter__(self) -> "Server":
+        started = threading.Event()
+        errors: List[BaseException] = []
+
+        def run() -> None:
+            loop = self._loop = asyncio.new_event_loop()
+            try:
+                loop.run_until_complete(self.start())
+            except Exception as error:
+                errors.append(error)
+                started.set()
+                loop.close()
+                return
+            started.set()
+            loop.run_forever()
+            loop.run_until_complete(self.stop())
+            loop.close()
+
+        self._thread = threading.Thread(target=run, name="respx-server", daemon=True)
+        self._thread.start()
+        started.wait()
+        if errors:
+            raise errors[0]
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]] = None,
+        exc_value: Optional[BaseException] = None,
+        traceback: Optional[TracebackType] = None,
+    ) -> None:
+        assert self._loop is not None and self._thread is not None
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._thread = self._loop = None
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        handler = asyncio.current_task()
+        assert handler is not None
+        self._handlers.add(handler)
+        try:
+            keep_alive = True
+            while keep_alive:
+                try:
+                    request, keep_alive = await self._read_request(reader, writer)
+                except asyncio.IncompleteReadError:
+                    break  # Connection closed by client
+                except (BadRequest, ValueError, asyncio.LimitOverrunError):
+                    writer.write(
+                        b"HTTP/1.1 400 Bad Request\r\n"
+                        b"Connection: close\r\nContent-Length: 0\r\n\r\n"
+                    )
+                    break
+
+                response = await self._resolve(request)
+                if response is None:
+                    writer.transport.abort()  # Mocked network error
+                    return
+
+                await self._write_response(writer, request, response, keep_alive)
+                await writer.drain()
+        except ConnectionError:  # pragma: nocover
+            pass
+        finally:
+            self._handlers.discard(handler)
+            writer.close()
+
+    async def _read_request(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> Tuple[httpx.Request, bool]:
+        head = await reader.readuntil(b"\r\n\r\n")
+        request_line, *header_lines = head[:-4].decode("latin-1").split("\r\n")
+        method, target, version = request_line.split(" ", 2)
+        if not version.startswith("HTTP/1."):
+            raise BadRequest(version)
+
+        headers: List[Tuple[str, str]] = []
+        for line in header_lines:
+            name, _, value = line.partition(":")
+            headers.append((name.strip(), value.strip()))
+        lowered = {name.lower(): value for name, value in headers}
+
+        if lowered.get("expect", "").lower() == "100-continue":
+            writer.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+
+        if "chunked" in lowered.get("transfer-encoding", "").lower():
+            content = await self._read_chunked(reader)
+            headers = [(n, v) for n, v in headers if n.lower() != "transfer-encoding"]
+        else:
+            length = int(lowered.get("content-length", 0))
+            content = await reader.readexactly(length) if length else b""
+
+        # Absolute form target, e.g. when used as proxy, else origin form target
+        if "://" in target:
+            url = httpx.URL(target)
+        else:
+            netloc = lowered.get("host") or f"{self.host}:{self.port}"
+            url = httpx.URL(f"http://{netloc}").copy_with(raw_path=target.encode())
+
+        connection = lowered.get("connection", "").lower()
+        keep_alive = (
+            connection != "close"
+            if version == "HTTP/1.1"
+            else connection == "keep-alive"
+        )
+        return httpx.Request(method, url, headers=headers, content=content), keep_alive
+
+    async def _read_chunked(self, reader: asyncio.StreamReader) -> bytes:
+        chunks: List[bytes] = []
+        while True:
+            size = int((await reader.readuntil(b"\r\n")).split(b";", 1)[0], 16)
+            if not size:
+                while await reader.readuntil(b"\r\n") != b"\r\n":
+                    pass  # Skip trailers
+                return b"".join(chunks)
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+
+    async def _resolve(self, request: httpx.Request) -> Optional[httpx.Response]:
+        """
+        Resolves a response for given request, or `None` for a mocked network error.
+        """
+        try:
+            resolved = await self.router.aresolve(request)
+        except AllMockedAssertionError as error:
+            return httpx.Response(404, text=str(error))
+        except PassThrough as error:
+            return httpx.Response(502, text=str(error))
+        except httpx.TransportError:
+            return None
+        except Exception as error:
+            return httpx.Response(500, text=f"{type(error).__name__}: {error}")
+
+        assert isinstance(resolved.response, httpx.Response)
+        return resolved.response
+
+    async def _write_response(
+        self,
+        writer: asyncio.StreamWriter,
+        request: httpx.Request,
+        response: httpx.Response,
+        keep_alive: bool,
+    ) -> None:
+        # Raw, i.e. still content encoded, body matching the response headers
+        if isinstance(response.stream, httpx.AsyncByteStream):
+            content = b"".join([chunk async for chunk in response.stream])
+            await response.aclose()
+        else:
+            content = b"".join(response.stream)
+            response.close()
+
+        status_line = f"HTTP/1.1 {response.status_code} {response.reason_phrase}"
+        lines = [status_line.encode("latin-1")]
+        lines.extend(
+            name + b": " + value
+            for name, value in response.headers.raw
+            if name.lower() not in REPLACED_HEADERS
+        )
+        # No body, nor length, for 1xx and 204 responses, and only a length, of the
+        # omitted body, for HEAD requests and 304 responses
+        status_code = response.status_code
+        has_length = status_code >= 200 and status_code != 204
+        has_body = has_length and status_code != 304 and request.method != "HEAD"
+        if has_body:
+            lines.append(b"Content-Length: %d" % len(content))
+        elif has_length and "Content-Length" in response.headers:
+            lines.append(
+                b"Content-Length: " + response.headers["Content-Length"].encode()
+            )
+        if not keep_alive:
+            lines.append(b"Connection: close")
+
+        lines.append(b"\r\n")
+        writer.write(b"\r\n".join(lines))
+        if has_body:
+            writer.write(content)
+
+
+def serve(router: "Router", *, host: str = "127.0.0.1", port: int = 0) -> Server:
+    """
+    Returns a local HTTP/1.1 server, answering requests with responses resolved by
+    given router, to start with `async with` or `with`.
+    """
+    return Server(router, host=host, port=port)
@@ -0,0 +1,81 @@
+import mmap
+import os
+from typing import TYPE_CHECKING, Dict, Iterable, Optional, Tuple
+
+if TYPE_CHECKING:
+    from .models import Route  # pragma: nocover
+
+
+class SharedCallCounts:
+    """
+    Route call counters in anonymous shared memory, surviving `fork()`.
+
+    Each forked child process lazily claims its own slot, i.e. row of counters,
+    once first recording a call, where the parent merges all slots when counting.
+    """
+
+    def __init__(self, routes: Iterable["Route"], *, slots: int) -> None:
+        import multiprocessing
+
+        # Hold on to routes, i.e. their ids are not reused by other routes
+        self.routes: Tuple["Route", ...] = tuple(routes)
+        self.indexes: Dict[int, int] = {
+            id(route): i for i, route in enumerate(self.routes)
+        }
+        self.slots = slots
+        self.pid = os.getpid()
+        self._size = len(self.routes)
+        self._slot: Optional[int] = None
+        self._lock = multiprocessing.Lock()
+        # First counter is the number of claimed slots, followed by the slot rows
+        self._mapping = mmap.mmap(-1, 8 * (1 + slots * self._size))
+        self._counts = memoryview(self._mapping).cast("Q")
+
+    def _claim(self) -> int:
+        with self._lock:
+            slot = self._counts[0]
+            if slot >= self.slots:
+                raise RuntimeError(
+                    f"RESPX: all {self.slots} shared call count slots are claimed"
+                )
+            self._counts[0] = slot + 1
+        self._slot = slot
+        self.pid = os.getpid()
+        return slot
+
+    def _index(self, route: "Route") -> Optional[int]:
+        index = self.indexes.get(id(route))
+        if index is None or self.routes[index] is not route:
+            return None
+        return index
+
+    def count_call(self, route: Optional["Route"]) -> bool:
+        """
+        Counts a call to given route, if in a forked child process.
+        Returns `False` if not counted, i.e. to record the call as usual.
+        """
+        if self.pid == os.getpid() and self._slot is None:
+            return False  # Parent process
+
+        index = self._index(route) if route is not None else -1
+        if index is None:
+            return False  # Route added after freezing
+
+        slot = self._slot
+        if slot is None or self.pid != os.getpid():
+            slot = self._claim()  # First call in this child, or a grandchild
+        if index >= 0:
+            self._counts[1 + slot * self._size + index] += 1
+        return True
+
+    def call_count(self, route: "Route") -> int:
+        """
+        Returns the merged call count of given route, from all child processes.
+        """
+        index = self._index(route)
+        if index is None:
+            return 0
+        return sum(
+            self._counts[1 + slot * self._size + index]
+            for slot in range(self._counts[0])
+        )
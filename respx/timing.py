@@ -0,0 +1,313 @@
+import asyncio
+import bisect
+import random
+import threading
+import time
+from abc import ABC
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    cast,
+)
+from unittest import mock
+
+import httpx
+
+# Keep references to the real clock functions, unaffected by any virtual clock patch
+_monotonic = time.monotonic
+_asleep = asyncio.sleep
+
+
+def _wake(waiter: "asyncio.Future[None]") -> None:
+    # Waiter may be cancelled, while its due timer callback is already ready
+    if not waiter.done():  # pragma: no branch
+        waiter.set_result(None)
+
+
+class Clock:
+    """
+    Wall clock, used to delay mocked responses.
+    """
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def sleep(self, seconds: float) -> None:
+        time.sleep(seconds)
+
+    async def asleep(self, seconds: float) -> None:
+        await asyncio.sleep(seconds)
+
+
+class VirtualClock(Clock):
+    """
+    Clock where sleeping advances time instantly, instead of waiting for it to pass.
+
+    Virtual time is wall time plus all simulated sleeps, i.e. measured elapsed time
+    includes delays. Async sleeps only advance time to the event loop's next pending
+    timer at a time, i.e. timers, like `asyncio.wait_for` deadlines, fire in order.
+    On event loops not based on `asyncio.BaseEventLoop`, e.g. uvloop, whose timers
+    can't be inspected, async sleeps advance time by the slept seconds at once.
+
+    When started, `time.monotonic`, `time.sleep` and `asyncio.sleep` are patched,
+    process-wide, to use virtual time, which also applies to the asyncio event loop
+    clock.
+    """
+
+    def __init__(self) -> None:
+        self.offset = 0.0
+        self._lock = threading.Lock()
+        self._patches: List[mock._patch] = []
+        self._sleeping: Dict[asyncio.AbstractEventLoop, int] = {}
+        self._drivers: Dict[asyncio.AbstractEventLoop, "asyncio.Task[None]"] = {}
+
+    def advance(self, seconds: float) -> None:
+        with self._lock:
+            self.offset += seconds
+
+    def monotonic(self) -> float:
+        return _monotonic() + self.offset
+
+    def sleep(self, seconds: float) -> None:
+        self.advance(max(0.0, seconds))
+
+    async def asleep(self, seconds: float) -> None:
+        if seconds <= 0:
+            await _asleep(0)
+            return
+
+        loop = asyncio.get_running_loop()
+        if not isinstance(loop, asyncio.BaseEventLoop):
+            self.advance(seconds)
+            await _asleep(0)
+            return
+
+        waiter = loop.create_future()
+        handle = loop.call_later(seconds, _wake, waiter)
+        self._sleeping[loop] = self._sleeping.get(loop, 0) + 1
+        if loop not in self._drivers:
+            self._drivers[loop] = loop.create_task(self._drive(loop))
+        try:
+            await waiter
+        finally:
+            handle.cancel()
+            self._sleeping[loop] -= 1
+            if not self._sleeping[loop]:
+                del self._sleeping[loop]
+
+    async def _drive(self, loop: asyncio.BaseEventLoop) -> None:
+        """
+        Advances time to the next pending timer, while any sleeps are pending, once
+        the event loop is idle, i.e. due timers fire, and their callbacks run, first.
+        """
+        try:
+            while loop in self._sleeping:
+                await _asleep(0)
+                # Ready callbacks, and pending timers, are private to the event loop
+                if not loop._ready:  # type: ignore[attr-defined]
+                    timers = loop._scheduled  # type: ignore[attr-defined]
+                    now = loop.time()
+                    when = min(
+                        (t.when() for t in timers if not t.cancelled()), default=now
+                    )
+                    self.advance(max(0.0, when - now))
+        finally:
+            del self._drivers[loop]
+
+    async def _asyncio_sleep(self, delay: float, result: Any = None) -> Any:
+        await self.asleep(delay)
+        return result
+
+    def start(self) -> None:
+        if self._patches:
+            return
+
+        self._patches = [
+            mock.patch("time.monotonic", self.monotonic),
+            mock.patch("time.sleep", self.sleep),
+            mock.patch("asyncio.sleep", self._asyncio_sleep),
+        ]
+        for patch in self._patches:
+            patch.start()
+
+    def stop(self) -> None:
+        while self._patches:
+            self._patches.pop().stop()
+
+
+class Delay(ABC):
+    """
+    Latency model, sampling the number of seconds to delay a mocked response.
+    """
+
+    def __init__(self, *, seed: Optional[int] = None) -> None:
+        self.seed = seed
+        self._random = random.Random(seed)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Pickle parameters and seed only, i.e. not random state, for stable dumps
+        return {k: v for k, v in self.__dict__.items() if k != "_random"}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        if "seed" in state:
+            self._random = random.Random(self.seed)
+
+    def __repr__(self):  # pragma: nocover
+        return f"<{self.__class__.__name__}>"
+
+    def sample(self) -> float:  # pragma: nocover
+        raise NotImplementedError()
+
+
+class Fixed(Delay):
+    def __init__(self, seconds: float) -> None:
+        # Not sampling, i.e. without a random generator
+        if seconds < 0:
+            raise ValueError(f"Invalid delay: {seconds!r}")
+        self.seconds = seconds
+
+    def sample(self) -> float:
+        return self.seconds
+
+
+class Uniform(Delay):
+    def __init__(self, low: float, high: float, *, seed: Optional[int] = None) -> None:
+        super().__init__(seed=seed)
+        if not 0 <= low <= high:
+            raise ValueError(f"Invalid delay range: {low!r} - {high!r}")
+        self.low = low
+        self.high = high
+
+    def sample(self) -> float:
+        return self._random.uniform(self.low, self.high)
+
+
+class Normal(Delay):
+    def __init__(
+        self, mean: float, stddev: float, *, seed: Optional[int] = None
+    ) -> None:
+        super().__init__(seed=seed)
+        if mean < 0 or stddev < 0:
+            raise ValueError(f"Invalid delay distribution: {mean!r}, {stddev!r}")
+        self.mean = mean
+        self.stddev = stddev
+
+    def sample(self) -> float:
+        # Clamp negative samples, i.e. responses can't arrive before requests
+        return max(0.0, self._random.gauss(self.mean, self.stddev))
+
+
+class Percentiles(Delay):
+    """
+    Latency given as a percentile table, e.g. `{50: 0.01, 99: 0.2, 100: 1.0}`.
+
+    Samples are linearly interpolated between the given percentiles.
+    """
+
+    def __init__(
+        self, table: Mapping[float, float], *, seed: Optional[int] = None
+    ) -> None:
+        super().__init__(seed=seed)
+        points = sorted(table.items())
+        if not points or any(not 0 <= p <= 100 or seconds < 0 for p, seconds in points):
+            raise ValueError(f"Invalid percentile table: {table!r}")
+        if any(a[1] > b[1] for a, b in zip(points, points[1:])):
+            raise ValueError(f"Percentile table must be increasing: {table!r}")
+        self.percentiles: Sequence[float] = tuple(p for p, _ in points)
+        self.seconds: Sequence[float] = tuple(s for _, s in points)
+
+    def sample(self) -> float:
+        p = self._random.uniform(0, 100)
+        i = bisect.bisect_left(self.percentiles, p)
+        if i == 0:
+            return self.seconds[0]
+        if i == len(self.percentiles):
+            return self.seconds[-1]
+        p0, p1 = self.percentiles[i - 1], self.percentiles[i]
+        s0, s1 = self.seconds[i - 1], self.seconds[i]
+        return s0 + (s1 - s0) * (p - p0) / (p1 - p0)
+
+
+DelayTypes = Union[float, Delay]
+
+
+def parse_delay(value: Optional[DelayTypes]) -> Optional[Delay]:
+    if value is None or isinstance(value, Delay):
+        return value
+    if isinstance(value, (int, float)):
+        return Fixed(value)
+    raise TypeError(f"Delay must be seconds or a Delay, got {value!r}")
+
+
+def parse_bandwidth(value: Optional[float]) -> Optional[float]:
+    if value is not None and value <= 0:
+        raise ValueError(f"Invalid bandwidth: {value!r} bytes/sec")
+    return value
+
+
+class ThrottledStream(httpx.SyncByteStream, httpx.AsyncByteStream):
+    """
+    Sync and async byte stream, throttling a wrapped stream to given bytes/sec.
+    """
+
+    # Number of slices per second, to get smooth throughput for large chunks
+    slices = 20
+
+    def __init__(
+        self,
+        stream: Union[httpx.SyncByteStream, httpx.AsyncByteStream],
+        bandwidth: float,
+        *,
+        clock: Optional[Clock] = None,
+    ) -> None:
+        self.stream = stream
+        self.bandwidth = bandwidth
+        self.clock = clock or Clock()
+        self.slice_size = max(1, int(bandwidth / self.slices))
+
+    def _slices(self, chunk: bytes) -> Iterator[Tuple[bytes, float]]:
+        for offset in range(0, len(chunk), self.slice_size):
+            piece = chunk[offset : offset + self.slice_size]
+            yield piece, len(piece) / self.bandwidth
+
+    def __iter__(self) -> Iterator[bytes]:
+        for chunk in cast(httpx.SyncByteStream, self.stream):
+            for piece, seconds in self._slices(chunk):
+                self.clock.sleep(seconds)
+                yield piece
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in cast(httpx.AsyncByteStream, self.stream):
+            for piece, seconds in self._slices(chunk):
+                await self.clock.asleep(seconds)
+                yield piece
+
+    def close(self) -> None:
+        cast(httpx.SyncByteStream, self.stream).close()
+
+    async def aclose(self) -> None:
+        await cast(httpx.AsyncByteStream, self.stream).aclose()
+
+
+def throttle_response(
+    response: httpx.Response, bandwidth: float, *, clock: Optional[Clock] = None
+) -> httpx.Response:
+    """
+    Creates a copy of given response, streaming its content at given bytes/sec.
+    """
+    return httpx.Response(
+        response.status_code,
+        headers=response.headers,
+        stream=ThrottledStream(response.stream, bandwidth, clock=clock),
+        request=response._request,
+        extensions=response.extensions,
+    )
@@ -66,6 +66,48 @@ class MockTransport(httpx.MockTransport):
         self.__exit__(*args)
 
 
+class HandlerTransport(BaseTransport, AsyncBaseTransport):
+    """
+    Mock transport, like `httpx.MockTransport`, but where the handler may return
+    the request itself, signaling `TryTransport` to pass it through.
+    """
+
+    def __init__(self, handler: Callable) -> None:
+        self.handler = handler
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        request.read()
+        return self.handler(request)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        return await self.handler(request)
+
+
+class RecordingTransport(BaseTransport, AsyncBaseTransport):
+    """
+    Pass-through transport, handing real responses to given callback for recording.
+    """
+
+    def __init__(
+        self,
+        transport: Union[BaseTransport, AsyncBaseTransport],
+        on_response: Callable[[httpx.Request, httpx.Response], httpx.Response],
+    ) -> None:
+        self.transport = transport
+        self.on_response = on_response
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        transport = cast(BaseTransport, self.transport)
+        response = transport.handle_request(request)
+        return self.on_response(request, response)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        transport = cast(AsyncBaseTransport, self.transport)
+        response = await transport.handle_async_request(request)
+        return self.on_response(request, response)
+
+
 class TryTransport(BaseTransport, AsyncBaseTransport):
     def __init__(
         self, transports: List[Union[BaseTransport, AsyncBaseTransport]]
@@ -76,9 +118,11 @@ class TryTransport(BaseTransport, AsyncBaseTransport):
         for transport in self.transports:
             try:
                 transport = cast(BaseTransport, transport)
-                return transport.handle_request(request)
+                response = transport.handle_request(request)
             except PassThrough:
                 continue
+            if isinstance(response, httpx.Response):
+                return response
 
         raise RuntimeError()  # pragma: nocover
 
@@ -86,8 +130,10 @@ class TryTransport(BaseTransport, AsyncBaseTransport):
         for transport in self.transports:
             try:
                 transport = cast(AsyncBaseTransport, transport)
-                return await transport.handle_async_request(request)
+                response = await transport.handle_async_request(request)
             except PassThrough:
                 continue
+            if isinstance(response, httpx.Response):
+                return response
 
         raise RuntimeError()  # pragma: nocover
@@ -1,8 +1,12 @@
 import email
+import hashlib
+import inspect
+import re
 from datetime import datetime
 from email.message import Message
 from typing import (
     Any,
+    Callable,
     Dict,
     List,
     Literal,
@@ -15,9 +19,13 @@ from typing import (
     cast,
 )
 from urllib.parse import parse_qsl
+from weakref import WeakKeyDictionary
 
 import httpx
 
+# Response headers describing raw content, i.e. not matching decoded content
+RAW_CONTENT_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
 
 class MultiItems(dict):
     def get_list(self, key: str) -> List[Any]:
@@ -30,8 +38,177 @@ class MultiItems(dict):
         return list(self.items())
 
 
+# Content pattern values of at least this size are kept, and matched, as digests
+DIGEST_MIN_SIZE = 64 * 1024
+
+
+class Digest:
+    """
+    Length and sha256 digest of content, lazily hashed once compared by length.
+    """
+
+    __slots__ = ("length", "_content", "_sha256")
+
+    def __init__(self, content: Union[bytes, memoryview]) -> None:
+        self.length = len(content)
+        self._content: Optional[Union[bytes, memoryview]] = content
+        self._sha256: Optional[bytes] = None
+
+    @classmethod
+    def of(cls, content: Union[bytes, memoryview]) -> "Digest":
+        """
+        Returns an eagerly hashed digest, i.e. not keeping given content alive.
+        """
+        digest = cls(content)
+        digest.sha256
+        return digest
+
+    @property
+    def sha256(self) -> bytes:
+        if self._sha256 is None:
+            assert self._content is not None
+            self._sha256 = hashlib.sha256(self._content).digest()
+            self._content = None
+        return self._sha256
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (bytes, memoryview)):
+            other = Digest(other)
+        if not isinstance(other, Digest):
+            return NotImplemented
+        return self.length == other.length and self.sha256 == other.sha256
+
+    def __hash__(self) -> int:
+        return hash((self.length, self.sha256))
+
+    def __repr__(self) -> str:  # pragma: nocover
+        return f"<Digest length={self.length} sha256={self.sha256.hex()}>"
+
+    def __getstate__(self) -> Tuple[int, bytes]:
+        return self.length, self.sha256
+
+    def __setstate__(self, state: Tuple[int, bytes]) -> None:
+        self.length, self._sha256 = state
+        self._content = None
+
+
+class URLComponents(NamedTuple):
+    """
+    Parsed url components, named as their `httpx.URL` equivalents.
+    """
+
+    scheme: str
+    host: str
+    port: Optional[int]
+    path: str
+
+
+_arg_names: "WeakKeyDictionary[Callable, Tuple[str, ...]]" = WeakKeyDictionary()
+
+
+def get_arg_names(func: Callable) -> Tuple[str, ...]:
+    """
+    Returns the positional argument names of given callable, cached per callable.
+    """
+    try:
+        return _arg_names[func]
+    except KeyError:
+        arg_names = _arg_names[func] = tuple(inspect.getfullargspec(func).args)
+        return arg_names
+    except TypeError:
+        # Not weak referenceable, or unhashable, callable
+        return tuple(inspect.getfullargspec(func).args)
+
+
+PARAM = re.compile(r';\s*([^\s=;]+)\s*=\s*("(?:[^"\\]|\\.)*"|[^;]*)')
+QUOTED_PAIR = re.compile(r"\\(.)")
+
+
+def _parse_header_params(value: str) -> Tuple[str, Dict[str, str]]:
+    """
+    Splits a header value, like `form-data; name="foo"`, into value and params.
+    """
+    value, _, params = value.partition(";")
+    return value.strip().lower(), {
+        name.lower(): (
+            QUOTED_PAIR.sub(r"\1", param[1:-1])
+            if param.startswith('"')
+            else param.strip()
+        )
+        for name, param in PARAM.findall(";" + params)
+    }
+
+
 def _parse_multipart_form_data(
     content: bytes, *, content_type: str, encoding: str
+) -> Tuple[MultiItems, MultiItems]:
+    """
+    Parses multipart form data by scanning for boundaries, only decoding part
+    headers and text fields, while file contents are zero-copy memory views.
+
+    Lenient bodies, i.e. with bare LF line breaks or content transfer encoded
+    parts, fall back to parsing with the `email` module.
+    """
+    data = MultiItems()
+    files = MultiItems()
+    _, params = _parse_header_params(content_type)
+    boundary = params.get("boundary")
+    if not boundary:
+        return data, files
+
+    delimiter = b"\r\n--" + boundary.encode(encoding)
+    view = memoryview(content)
+
+    # First delimiter may lack the leading line break, i.e. without preamble
+    pos = content.find(delimiter[2:])
+    if pos == -1:
+        return data, files
+    if delimiter not in content and delimiter[1:] in content:
+        return _parse_mime_form_data(
+            content, content_type=content_type, encoding=encoding
+        )
+    pos += len(delimiter) - 2
+
+    while content[pos : pos + 2] != b"--":  # Close delimiter
+        headers_end = content.find(b"\r\n\r\n", pos)
+        if headers_end == -1:
+            break
+        end = content.find(delimiter, headers_end + 4)
+        if end == -1:
+            break
+
+        headers = {}
+        raw_headers = content[pos:headers_end].decode("utf-8", "replace")
+        for line in raw_headers.split("\r\n"):
+            header_name, sep, header_value = line.partition(":")
+            if sep:
+                headers[header_name.strip().lower()] = header_value.strip()
+        if "content-transfer-encoding" in headers:
+            return _parse_mime_form_data(
+                content, content_type=content_type, encoding=encoding
+            )
+
+        _, disposition = _parse_header_params(headers.get("content-disposition", ""))
+        part_type, part_params = _parse_header_params(
+            headers.get("content-type", "text/plain")
+        )
+        name = disposition.get("name")
+        filename = disposition.get("filename")
+        value = view[headers_end + 4 : end]
+        if part_type.startswith("text/") and filename is None:
+            # Text field
+            data[name] = str(value, part_params.get("charset") or "utf-8")
+        else:
+            # File field
+            files[name] = filename, value
+
+        pos = end + len(delimiter)
+
+    return data, files
+
+
+def _parse_mime_form_data(
+    content: bytes, *, content_type: str, encoding: str
 ) -> Tuple[MultiItems, MultiItems]:
     form_data = b"\r\n".join(
         (
@@ -66,7 +243,56 @@ def _parse_urlencoded_data(content: bytes, *, encoding: str) -> MultiItems:
     )
 
 
+_decoded_data: "WeakKeyDictionary[httpx.Request, Tuple[MultiItems, MultiItems]]" = (
+    WeakKeyDictionary()
+)
+
+
 def decode_data(request: httpx.Request) -> Tuple[MultiItems, MultiItems]:
+    """
+    Returns decoded form data and files of given request, cached per request.
+    """
+    try:
+        return _decoded_data[request]
+    except KeyError:
+        decoded = _decoded_data[request] = _decode_data(request)
+        return decoded
+
+
+_content_digests: "WeakKeyDictionary[httpx.Request, Digest]" = WeakKeyDictionary()
+
+
+def get_content_digest(request: httpx.Request) -> Digest:
+    """
+    Returns a lazily hashed digest of given request content, cached per request.
+    """
+    try:
+        return _content_digests[request]
+    except KeyError:
+        digest = _content_digests[request] = Digest(request.read())
+        return digest
+
+
+_files_digests: "WeakKeyDictionary[httpx.Request, MultiItems]" = WeakKeyDictionary()
+
+
+def get_files_digests(request: httpx.Request) -> MultiItems:
+    """
+    Returns decoded files of given request, with lazily hashed digests of their
+    content, cached per request.
+    """
+    try:
+        return _files_digests[request]
+    except KeyError:
+        _, files = decode_data(request)
+        digests = _files_digests[request] = MultiItems(
+            (name, (filename, Digest(value)))
+            for name, (filename, value) in files.items()
+        )
+        return digests
+
+
+def _decode_data(request: httpx.Request) -> Tuple[MultiItems, MultiItems]:
     content = request.read()
     content_type = request.headers.get("Content-Type", "")
 
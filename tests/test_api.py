@@ -2,6 +2,8 @@ import asyncio
 import json as jsonlib
 import re
 import socket
+import subprocess
+import sys
 from unittest import mock
 
 import httpcore
@@ -564,6 +566,68 @@ def test_respond():
             route.respond(content=Exception())  # type: ignore[arg-type]
 
 
+@pytest.mark.parametrize("using", ["httpcore", "httpx"])
+async def test_respond_with_file(tmp_path, using):
+    path = tmp_path / "download.bin"
+    path.write_bytes(b"foobar" * 1000)
+
+    async with respx.mock(using=using) as respx_mock:
+        route = respx_mock.get("https://foo.bar/").respond(file=path, chunk_size=4096)
+        assert route.return_value is not None
+        stream = route.return_value.stream
+        assert isinstance(stream, respx.models.FileStream)
+
+        with httpx.stream("GET", "https://foo.bar/") as response:
+            assert response.headers["Content-Length"] == "6000"
+            chunks = list(response.iter_raw())
+
+        async with httpx.AsyncClient() as client:
+            async with client.stream("GET", "https://foo.bar/") as async_response:
+                async_chunks = [chunk async for chunk in async_response.aiter_raw()]
+
+        assert chunks == async_chunks
+        assert [len(chunk) for chunk in chunks] == [4096, 1904]
+        assert b"".join(chunks) == path.read_bytes()
+        assert route.call_count == 2
+        assert stream._mapping is None  # Released once responses are closed
+
+        path = tmp_path / "empty.bin"
+        path.touch()
+        route.respond(file=str(path))
+        response = httpx.get("https://foo.bar/")
+        assert response.headers["Content-Length"] == "0"
+        assert response.content == b""
+
+    with pytest.raises(TypeError, match="can't be combined"):
+        route.respond(content=b"foobar", file=path)
+
+    with pytest.raises(ValueError, match="Invalid chunk size"):
+        route.respond(file=path, chunk_size=0)
+
+
+async def test_file_stream_close(tmp_path):
+    path = tmp_path / "download.bin"
+    path.write_bytes(b"foobar")
+    stream = respx.models.FileStream(path, chunk_size=3)
+
+    def mapped() -> bool:
+        return stream._mapping is not None
+
+    reading = iter(stream)
+    assert next(reading) == b"foo"
+    stream.close()  # Mapping kept, while still read
+    assert mapped()
+    assert list(stream) == [b"foo", b"bar"]
+    assert list(reading) == [b"bar"]
+
+    stream.close()
+    assert not mapped()
+    assert [chunk async for chunk in stream] == [b"foo", b"bar"]  # Mapped again
+    await stream.aclose()
+    assert not mapped()
+    stream.close()  # Already released
+
+
 def test_can_respond_with_cookies():
     with respx.mock:
         route = respx.get("https://foo.bar/").respond(
@@ -620,3 +684,16 @@ async def test_async_post_content(kwargs):
         async with httpx.AsyncClient() as client:
             response = await client.post("https://foo.bar/", **kwargs)
             assert response.status_code == 201
+
+
+def test_import_time():
+    # Heavy dependencies are imported lazily, when first needed
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import respx"],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    imported = {line.rsplit("|", 1)[-1].strip() for line in result.stderr.splitlines()}
+    assert "respx" in imported
+    assert not imported & {"httpcore", "http.cookies"}
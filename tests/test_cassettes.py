@@ -0,0 +1,187 @@
+import gzip
+import pickle
+from typing import List
+
+import httpcore
+import httpx
+import pytest
+
+import respx
+from respx.cassettes import CASSETTE_HEADER, ENTRY, Cassette, RecordingStream
+from respx.models import Route
+from respx.router import MockRouter
+
+
+def test_cassette_replay(tmp_path):
+    path = tmp_path / "foo.cassette"
+    cassette = Cassette(path)
+    assert len(cassette) == 0
+    assert not path.exists()
+
+    request = httpx.Request("GET", "https://foo.bar/")
+    assert cassette(request) is None
+
+    key = cassette.fingerprint(request)
+    cassette.append(key, 200, [(b"X-Foo", b"bar")], b"first")
+    cassette.append(key, 201, [], b"second")
+    assert len(cassette) == 2
+    assert path.read_bytes().startswith(CASSETTE_HEADER)
+
+    # Recorded responses are replayed in order, repeating the last one
+    for status_code, content in ((200, b"first"), (201, b"second"), (201, b"second")):
+        response = cassette(request)
+        assert response is not None
+        assert response.status_code == status_code
+        assert response.read() == content
+        assert response.request is request
+    assert cassette(httpx.Request("POST", "https://foo.bar/")) is None
+
+    # Reload, and append after a truncated, e.g. interrupted, entry
+    with path.open("ab") as f:
+        f.write(ENTRY.pack(key, 200, 0, 100) + b"partial")
+    cassette = Cassette(path)
+    assert len(cassette) == 2
+    response = cassette(request)
+    assert response is not None
+    assert response.headers["X-Foo"] == "bar"
+    cassette.append(key, 202, [], b"third")
+    assert len(Cassette(path)) == 3
+
+
+async def test_recording_stream():
+    recorded: List[bytes] = []
+    stream = RecordingStream([b"foo", b"bar"], recorded.append)
+    assert list(stream) == [b"foo", b"bar"]
+    stream.close()
+    await stream.aclose()
+    assert recorded == [b"foobar"]
+
+
+def test_cassette_invalid_file(tmp_path):
+    path = tmp_path / "foo.cassette"
+    path.write_bytes(b"foobar")
+    with pytest.raises(ValueError, match="Invalid respx cassette"):
+        Cassette(path)
+
+
+def test_route_record():
+    cassette = Cassette("foo.cassette")
+    route = Route(url="https://foo.bar/").record(cassette)
+    assert route.is_pass_through
+    assert route._recorder is cassette
+    assert not route.reads_content
+
+    with pytest.raises(TypeError, match="recording route"):
+        pickle.dumps(route)
+
+    assert route.pass_through(False)._recorder is None
+
+    route = Route().mock(side_effect=cassette)
+    assert not route.reads_content
+
+
+@pytest.mark.parametrize("using", ["httpcore", "httpx"])
+async def test_record_and_replay(tmp_path, using):
+    cassette = Cassette(tmp_path / "foo.cassette")
+    real_transport = httpx.MockTransport(
+        lambda request: httpx.Response(200, text=request.url.path)
+    )
+    stream_transport = httpx.MockTransport(
+        lambda request: httpx.Response(200, stream=httpx.ByteStream(b"stream"))
+    )
+
+    async with MockRouter(using="httpx") as respx_mock:
+        route = respx_mock.get(host="foo.bar").record(cassette)
+        respx_mock.get(host="ham.spam").pass_through()
+
+        with httpx.Client(transport=real_transport) as client:
+            assert client.get("https://foo.bar/one/").text == "/one/"
+            assert client.get("https://ham.spam/").text == "/"
+        async with httpx.AsyncClient(transport=real_transport) as async_client:
+            response = await async_client.get("https://foo.bar/two/")
+            assert response.text == "/two/"
+
+        with httpx.Client(transport=stream_transport) as client:
+            with client.stream("GET", "https://foo.bar/three/") as response:
+                assert response.read() == b"stream"
+
+        assert route.call_count == 3
+        assert len(cassette) == 3
+
+        # Recorded requests are replayed, without passing through
+        with httpx.Client(transport=stream_transport) as client:
+            assert client.get("https://foo.bar/one/").text == "/one/"
+        assert len(cassette) == 3
+
+    # Replay only, e.g. by another mocker
+    async with MockRouter(using=using) as respx_mock:
+        respx_mock.route(host="foo.bar").mock(side_effect=cassette)
+        async with httpx.AsyncClient() as async_client:
+            response = await async_client.get("https://foo.bar/two/")
+            assert response.text == "/two/"
+
+
+def test_record_decoded(tmp_path):
+    cassette = Cassette(tmp_path / "foo.cassette")
+    real_transport = httpx.MockTransport(
+        lambda request: httpx.Response(
+            200, content=gzip.compress(b"foo"), headers={"Content-Encoding": "gzip"}
+        )
+    )
+
+    with MockRouter(using="httpx") as respx_mock:
+        respx_mock.get(host="foo.bar").record(cassette)
+        with httpx.Client(transport=real_transport) as client:
+            assert client.get("https://foo.bar/").content == b"foo"
+
+    # Replayed as decoded content, without the content encoding header
+    response = cassette(httpx.Request("GET", "https://foo.bar/"))
+    assert response is not None
+    assert response.read() == b"foo"
+    assert "Content-Encoding" not in response.headers
+    assert "Content-Length" not in response.headers
+
+
+def test_httpcore_record(tmp_path):
+    cassette = Cassette(tmp_path / "foo.cassette")
+    network_backend = httpcore.MockBackend(
+        [b"HTTP/1.1 200 OK\r\n", b"Content-Length: 3\r\n", b"\r\n", b"foo"]
+    )
+
+    with respx.mock(using="httpcore") as respx_mock:
+        respx_mock.get("https://foo.bar/").record(cassette)
+
+        with httpcore.ConnectionPool(network_backend=network_backend) as pool:
+            response = pool.request("GET", "https://foo.bar/")
+            assert response.content == b"foo"
+        assert len(cassette) == 1
+
+        with httpcore.ConnectionPool(network_backend=network_backend) as pool:
+            response = pool.request("GET", "https://foo.bar/")
+            assert response.content == b"foo"
+        assert len(cassette) == 1
+
+
+async def test_async_httpcore_record(tmp_path):
+    cassette = Cassette(tmp_path / "foo.cassette")
+    network_backend = httpcore.AsyncMockBackend(
+        [b"HTTP/1.1 404 Not Found\r\n", b"Content-Length: 3\r\n", b"\r\n", b"foo"]
+    )
+
+    async with respx.mock(using="httpcore") as respx_mock:
+        respx_mock.get("https://foo.bar/").record(cassette)
+
+        async with httpcore.AsyncConnectionPool(
+            network_backend=network_backend
+        ) as pool:
+            response = await pool.request("GET", "https://foo.bar/")
+            assert response.status == 404
+            assert response.content == b"foo"
+
+    replayed = Cassette(tmp_path / "foo.cassette")(
+        httpx.Request("GET", "https://foo.bar/")
+    )
+    assert replayed is not None
+    assert replayed.status_code == 404
+    assert replayed.headers["Content-Length"] == "3"
+    assert replayed.read() == b"foo"
@@ -0,0 +1,139 @@
+import json
+
+import httpx
+import pytest
+
+import respx
+from respx.har import HAR, LazyText, Scanner
+from respx.router import MockRouter
+
+ENTRIES = [
+    {
+        "request": {"method": "get", "url": "https://foo.bar/?page=1"},
+        "response": {
+            "status": 200,
+            "headers": [
+                {"name": ":status", "value": "200"},
+                {"name": "Content-Type", "value": "application/json"},
+                {"name": "Content-Encoding", "value": "gzip"},
+            ],
+            "content": {"size": 13, "text": '{"foo": "bär"}'},
+        },
+    },
+    {
+        "request": {"method": "GET", "url": "https://foo.bar/?page=1"},
+        "response": {"status": 304, "headers": [], "content": {}},
+    },
+    {
+        "request": {
+            "method": "POST",
+            "url": "https://foo.bar/upload/",
+            "postData": {"text": "data"},
+        },
+        "response": {
+            "status": 201,
+            "headers": [],
+            "content": {"text": "aGFtIHNwYW0=", "encoding": "base64"},
+        },
+    },
+    {
+        "request": {"method": "GET", "url": "https://ham.spam/"},
+        "response": {"status": 0, "headers": [], "content": {}},
+    },
+]
+
+
+@pytest.fixture
+def har_path(tmp_path):
+    path = tmp_path / "foo.har"
+    path.write_text(json.dumps({"log": {"version": "1.2", "entries": ENTRIES}}))
+    return path
+
+
+@pytest.mark.parametrize(
+    ("data", "expected"),
+    [
+        (b' {"a": [1, -2.5e3, true, false, null, "\\u00e4"], "b": {}, "c": []} ', None),
+        (b'{"text": "foo \\"bar\\""}', {"text": LazyText(9, 22)}),
+        (b'\xef\xbb\xbf{"text": ""}', {"text": LazyText(12, 14)}),
+    ],
+)
+def test_scanner(data, expected):
+    value = Scanner(data).scan()
+    assert value == (json.loads(data) if expected is None else expected)
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"",
+        b"\xef\xbb\xbf",
+        b"{} []",
+        b'"foo',
+        b"{1: 2}",
+        b'{"foo" 1}',
+        b"[1 2]",
+        b"nope",
+    ],
+)
+def test_scanner_invalid(data):
+    with pytest.raises(ValueError):
+        Scanner(data).scan()
+
+
+def test_har(har_path):
+    har = HAR(har_path)
+    assert len(har) == 3
+
+    # Recorded responses are replayed in order, repeating the last one
+    request = httpx.Request("GET", "https://foo.bar/?page=1")
+    response = har(request)
+    assert response is not None
+    assert response.status_code == 200
+    assert response.json() == {"foo": "bär"}
+    assert response.headers["Content-Length"] == "15"
+    assert "Content-Encoding" not in response.headers
+    assert ":status" not in response.headers
+    for _ in range(2):
+        response = har(request)
+        assert response is not None
+        assert response.status_code == 304
+        assert response.content == b""
+
+    response = har(httpx.Request("POST", "https://foo.bar/upload/"))
+    assert response is not None
+    assert response.content == b"ham spam"
+
+    assert har(httpx.Request("GET", "https://ham.spam/")) is None
+
+
+@pytest.mark.parametrize("content", [b"", b"[]", b'{"log": {}}', b'{"log": '])
+def test_har_invalid(tmp_path, content):
+    path = tmp_path / "foo.har"
+    path.write_bytes(content)
+    with pytest.raises(ValueError, match="Invalid HAR file"):
+        HAR(path)
+
+
+async def test_load_har(har_path):
+    async with MockRouter(assert_all_mocked=False) as respx_mock:
+        route = respx_mock.load_har(har_path, name="har", host="foo.bar")
+        assert respx_mock["har"] is route
+        assert not respx_mock.reads_content
+
+        async with httpx.AsyncClient() as client:
+            response = await client.get("https://foo.bar/", params={"page": 1})
+            assert response.json() == {"foo": "bär"}
+            response = await client.get("https://foo.bar/")
+            assert response.status_code == 200
+            assert response.content == b""
+
+        assert route.call_count == 1
+
+
+@respx.mock
+def test_load_har_api(har_path):
+    route = respx.load_har(har_path, method="POST")
+    response = httpx.post("https://foo.bar/upload/")
+    assert response.status_code == 201
+    assert route.called
@@ -1,4 +1,7 @@
+import asyncio
+import pickle
 from contextlib import ExitStack as does_not_raise
+from dataclasses import dataclass
 
 import httpcore
 import httpx
@@ -6,8 +9,9 @@ import pytest
 
 import respx
 from respx import ASGIHandler, WSGIHandler
-from respx.mocks import Mocker
+from respx.mocks import AbstractRequestMocker, HTTPCoreRequest, Mocker
 from respx.models import AllMockedAssertionError
+from respx.patterns import M, Pattern
 from respx.router import MockRouter
 
 
@@ -371,6 +375,37 @@ def test_leakage(mocked_foo, mocked_ham):
     assert len(respx.routes) == 0
     assert len(respx.calls) == 0
     assert len(Mocker.registry["httpcore"].routers) == 2
+    assert Mocker.registry["httpcore"]._dispatch == tuple(
+        Mocker.registry["httpcore"].routers
+    )
+
+
+def test_dispatch_index(mocked_foo, mocked_ham):
+    mocker = Mocker.registry["httpcore"]
+
+    def candidates(url):
+        return mocker.candidates(httpx.Request("GET", url))
+
+    assert candidates("https://foo.api/api/") == (mocked_foo,)
+    assert candidates("https://ham.api/") == (mocked_ham,)
+    assert candidates("https://egg.api/") == ()
+
+    with respx.mock(using="httpcore", assert_all_called=False) as respx_mock:
+        respx_mock.get(host__in=("foo.api", "egg.api"))
+        assert candidates("https://foo.api/") == (mocked_foo, respx_mock)
+        assert candidates("https://egg.api/") == (respx_mock,)
+        assert candidates("https://spam.api/") == ()
+
+        # Rebuilt once routes change, where routes not requiring a host match any
+        respx_mock.route(host__regex=r"^spam\.")
+        respx_mock.route(M(host="ham.api") | M(host="spam.api"))
+        assert candidates("https://spam.api/") == (respx_mock,)
+        assert candidates("https://ham.api/") == (mocked_ham, respx_mock)
+
+    with respx.mock(using="httpcore", assert_all_mocked=False) as respx_mock:
+        assert candidates("https://egg.api/") == (respx_mock,)
+        response = httpcore.request("GET", "https://egg.api/")
+        assert response.status == 200
 
 
 async def test_start_stop(client):
@@ -540,6 +575,127 @@ def test_mocker_subclass():
     assert not hasattr(Hamspam, "routers")
 
 
+@pytest.mark.parametrize(
+    ("url", "parsed"),
+    [
+        ("https://FOO.bar/ham?spam=1", False),
+        ("http://foo.bar:8080/", False),
+        ("https://foo.bar:443/", False),
+        ("https://xn--bcher-kva.example/", True),
+        ("https://foo.bar/ham%20spam", True),
+        ("https://foo.bar/ham/../spam", True),
+    ],
+)
+def test_httpcore_request_view(url, parsed):
+    request = HTTPCoreRequest(
+        httpcore.Request(b"get", url, headers={"X-Foo": "bar"}, extensions={})
+    )
+    assert request.method == "GET"
+    assert "_url" in request.__dict__ and request._url is None
+
+    expected = httpx.URL(url)
+    components = request.url_components
+    assert components == (expected.scheme, expected.host, expected.port, expected.path)
+    assert (request._url is not None) is parsed
+    assert request.url == expected
+    assert request.headers["x-foo"] == "bar"
+
+    # Replaced url and headers
+    request.url = httpx.URL("https://ham.spam/egg")
+    request.headers = httpx.Headers({"X-Ham": "spam"})
+    assert request.url_components == ("https", "ham.spam", None, "/egg")
+    assert dict(request.headers) == {"x-ham": "spam"}
+
+    request.read()
+    copy = pickle.loads(pickle.dumps(request))
+    assert isinstance(copy, HTTPCoreRequest)
+    assert copy.url == request.url
+    assert copy.headers == request.headers
+    assert copy.content == b""
+    assert copy.url_components == request.url_components
+
+
+async def test_httpcore_request_read_on_demand():
+    class Unread(Pattern):
+        def parse(self, request):
+            return not hasattr(request, "_content")
+
+    async def astream():
+        yield b"foo"
+
+    with respx.mock(using="httpcore") as respx_mock:
+        route = respx_mock.route(Unread(True)) % 204
+
+        # Body not pre-read, but after being mocked
+        request = httpcore.Request("POST", "https://foo.bar/", content=iter([b"foo"]))
+        with httpcore.ConnectionPool() as http:
+            response = http.handle_request(request)
+        assert response.status == 204
+        assert route.calls.last.request.content == b"foo"
+
+        request = httpcore.Request("POST", "https://foo.bar/", content=astream())
+        async with httpcore.AsyncConnectionPool() as async_http:
+            response = await async_http.handle_async_request(request)
+        assert response.status == 204
+        assert route.calls.last.request.content == b"foo"
+
+        # Body pre-read for content patterns
+        content_route = respx_mock.route(content=b"foo") % 201
+        assert not route.reads_content and content_route.reads_content
+
+        request = httpcore.Request("POST", "https://foo.bar/", content=iter([b"foo"]))
+        with httpcore.ConnectionPool() as http:
+            response = http.handle_request(request)
+        assert response.status == 201
+
+        request = httpcore.Request("POST", "https://foo.bar/", content=astream())
+        async with httpcore.AsyncConnectionPool() as async_http:
+            response = await async_http.handle_async_request(request)
+        assert response.status == 201
+
+    # Body read for call records, when side effect raises
+    with respx.mock(using="httpcore") as respx_mock:
+        route = respx_mock.post("https://foo.bar/").mock(side_effect=httpx.ConnectError)
+
+        request = httpcore.Request("POST", "https://foo.bar/", content=iter([b"foo"]))
+        with httpcore.ConnectionPool() as http:
+            with pytest.raises(httpx.ConnectError):
+                http.handle_request(request)
+        assert route.calls.last.request.content == b"foo"
+
+        request = httpcore.Request("POST", "https://foo.bar/", content=astream())
+        async with httpcore.AsyncConnectionPool() as async_http:
+            with pytest.raises(httpx.ConnectError):
+                await async_http.handle_async_request(request)
+        assert route.calls.last.request.content == b"foo"
+
+    router = MockRouter()
+    assert router.route().mock(side_effect=lambda request: None).reads_content
+    assert not router.route().mock(side_effect=httpx.ConnectError).reads_content
+
+
+def test_request_mocker_binder():
+    def spec(self, request, timeout=5.0, *args, extensions=None, **kwargs):
+        pass  # pragma: nocover
+
+    bind_args = AbstractRequestMocker._compile_binder(spec)
+    assert bind_args("req") == {"request": "req", "timeout": 5.0, "extensions": None}
+    assert bind_args("req", 1, 2, foo="bar") == {
+        "request": "req",
+        "timeout": 1,
+        "extensions": None,
+        "foo": "bar",
+    }
+
+    def spec2(self, url, *, method="GET"):
+        pass  # pragma: nocover
+
+    bind_args = AbstractRequestMocker._compile_binder(spec2)
+    assert bind_args(method="POST", url="u") == {"url": "u", "method": "POST"}
+    with pytest.raises(TypeError):
+        bind_args("u", "POST")
+
+
 def test_sync_httpx_mocker():
     class TestTransport(httpx.BaseTransport):
         def handle_request(self, *args, **kwargs):
@@ -557,6 +713,10 @@ def test_sync_httpx_mocker():
             assert response.status_code == 204
             assert mock_route.call_count == 1
 
+            # Wrapped transport is cached per client and real transport
+            transport = client._transport_for_url(httpx.URL("https://example.org/"))
+            assert client._transport_for_url(httpx.URL("https://foo.bar/")) is transport
+
             with pytest.raises(RuntimeError, match="would pass through"):
                 client.get("https://pass-through/")
             assert pass_route.call_count == 1
@@ -568,6 +728,29 @@ def test_sync_httpx_mocker():
         test()
 
 
+@pytest.mark.parametrize("eq", [True, False])
+def test_httpx_mocker__uncached_transport(eq):
+    if eq:
+
+        @dataclass
+        class TestTransport(httpx.BaseTransport):
+            name: str = "unhashable"
+
+    else:
+
+        class TestTransport:  # type: ignore[no-redef]
+            __slots__ = ()  # Not weak referenceable
+
+            def handle_request(self, request):
+                raise NotImplementedError()  # pragma: nocover
+
+    with respx.mock(using="httpx") as respx_mock:
+        respx_mock.get("https://foo.bar/") % 204
+        client = httpx.Client(transport=TestTransport())
+        assert client.get("https://foo.bar/").status_code == 204
+        assert client.get("https://foo.bar/").status_code == 204
+
+
 async def test_async_httpx_mocker():
     class TestTransport(httpx.AsyncBaseTransport):
         async def handle_async_request(self, *args, **kwargs):
@@ -730,3 +913,38 @@ async def test_route_rollback():
         async with httpx.AsyncClient(base_url="https://example.org/") as client:
             response = await client.delete("/foobar/")
             assert response.status_code == 202
+
+
+@pytest.mark.parametrize("using", ["httpcore", "httpx"])
+async def test_context_local(client, using):
+    async def scenario(status_code):
+        async with respx.mock(using=using, context_local=True) as respx_mock:
+            route = respx_mock.get("https://example.org/") % status_code
+            respx_mock.post("https://example.org/", content=b"foo") % 201
+            for _ in range(3):
+                await asyncio.sleep(0)  # Interleave with other scenarios
+                response = await client.get("https://example.org/")
+                assert response.status_code == status_code
+
+            # Tasks created within inherit context routers, before global ones
+            response = await asyncio.create_task(client.get("https://example.org/"))
+            assert response.status_code == status_code
+            response = await client.get("https://example.org/global/")
+            assert response.status_code == 200
+
+            response = await client.post("https://example.org/", content=b"foo")
+            assert response.status_code == 201
+            assert route.call_count == 4
+
+    mocker = Mocker.registry[using]
+    async with respx.mock(using=using) as respx_mock:
+        global_route = respx_mock.get("https://example.org/global/") % 200
+        await asyncio.gather(*(scenario(status_code) for status_code in (202, 204)))
+        assert global_route.call_count == 2
+
+        # Only global routers outside context local ones
+        with pytest.raises(AllMockedAssertionError):
+            await client.get("https://example.org/")
+
+        assert mocker.context_routers == []
+        assert mocker.dispatch() == tuple(mocker.routers)
@@ -26,6 +26,7 @@ from respx.patterns import (
     merge_patterns,
     parse_url_patterns,
 )
+from respx.utils import DIGEST_MIN_SIZE, Digest
 
 
 def test_bitwise_and():
@@ -324,6 +325,24 @@ def test_content_pattern(lookup, content, expected):
     assert bool(match) is expected
 
 
+@pytest.mark.parametrize(
+    ("content", "expected"),
+    [
+        (b"x" * DIGEST_MIN_SIZE, True),
+        (b"x" * (DIGEST_MIN_SIZE - 1) + b"y", False),  # Same length
+        (b"x" * (DIGEST_MIN_SIZE + 1), False),  # Different length
+    ],
+)
+def test_content_pattern_digest(content, expected):
+    pattern = Content(b"x" * DIGEST_MIN_SIZE)
+    assert isinstance(pattern.value, Digest)
+    assert pattern == Content("x" * DIGEST_MIN_SIZE)
+
+    request = httpx.Request("POST", "https://foo.bar/", content=content)
+    assert bool(pattern.match(request)) is expected
+    assert bool(pattern.match(request)) is expected  # Cached request digest
+
+
 @pytest.mark.parametrize(
     ("lookup", "data", "request_data", "expected"),
     [
@@ -530,6 +549,24 @@ def test_files_pattern(lookup, files, request_files, expected):
     assert bool(match) is expected
 
 
+@pytest.mark.parametrize(
+    ("request_files", "expected"),
+    [
+        ({"big": io.BytesIO(b"x" * DIGEST_MIN_SIZE), "small": b"foo"}, True),
+        ({"big": b"x" * (DIGEST_MIN_SIZE - 1) + b"y", "small": b"foo"}, False),
+        ({"big": b"x" * DIGEST_MIN_SIZE, "small": b"bar"}, False),
+    ],
+)
+def test_files_pattern_digest(request_files, expected):
+    pattern = Files({"big": io.BytesIO(b"x" * DIGEST_MIN_SIZE), "small": b"foo"})
+    assert pattern.value["big"] == (ANY, Digest.of(b"x" * DIGEST_MIN_SIZE))
+    assert pattern.value["small"] == (ANY, b"foo")
+
+    request = httpx.Request("POST", "https://foo.bar/", files=request_files)
+    assert bool(pattern.match(request)) is expected
+    assert bool(pattern.match(request)) is expected  # Cached request digests
+
+
 @pytest.mark.parametrize(
     ("lookup", "value", "json", "expected"),
     [
@@ -38,3 +38,42 @@ def test_respx_mock_fixture(testdir):
     )
     result = testdir.runpytest("-p", "respx")
     result.assert_outcomes(passed=4)
+
+
+def test_respx_shared_mock_fixtures(testdir):
+    testdir.makepyfile(
+        """
+        import httpx
+        import pytest
+
+        @pytest.fixture(scope="session")
+        def api(respx_session_mock):
+            respx_session_mock.get("https://foo.bar/", name="foo") % 204
+            return respx_session_mock
+
+        @pytest.fixture(scope="module")
+        def module_api(respx_module_mock):
+            respx_module_mock.get("https://ham.spam/", name="ham") % 201
+            return respx_module_mock
+
+        def test_first(api):
+            api.get("https://egg.yolk/", name="egg") % 202
+            api["foo"].respond(200)
+            assert httpx.get("https://foo.bar/").status_code == 200
+            assert httpx.get("https://egg.yolk/").status_code == 202
+            assert api.calls.call_count == 2
+
+        def test_second(api, module_api):
+            assert "egg" not in api.routes
+            assert not api.calls.called
+            assert not api["foo"].called
+            assert httpx.get("https://foo.bar/").status_code == 204
+            assert httpx.get("https://ham.spam/").status_code == 201
+            assert module_api["ham"].call_count == 1
+
+        def test_third(respx_session_mock):
+            assert len(respx_session_mock.routes) == 1
+        """
+    )
+    result = testdir.runpytest("-p", "respx")
+    result.assert_outcomes(passed=3)
@@ -1,12 +1,20 @@
+import gc
+import itertools
+import json
+import os
+import subprocess
+import sys
 import warnings
 
 import httpcore
 import httpx
 import pytest
 
-from respx import Route, Router
+import respx
+from respx import Observer, ResolveStats, Route, Router
 from respx.models import AllMockedAssertionError, PassThrough, RouteList
 from respx.patterns import Host, M, Method
+from respx.timing import Uniform
 
 
 async def test_empty_router():
@@ -19,6 +27,13 @@ async def test_empty_router():
     with pytest.raises(AllMockedAssertionError):
         await router.aresolve(request)
 
+    # Quiet miss, i.e. unresolved and not recorded
+    resolved = router.resolve(request, quiet=True)
+    assert resolved.route is None and resolved.response is None
+    resolved = await router.aresolve(request, quiet=True)
+    assert resolved.route is None and resolved.response is None
+    assert not router.calls
+
 
 async def test_empty_router__auto_mocked():
     router = Router(assert_all_mocked=False)
@@ -80,6 +95,12 @@ def test_pass_through():
     assert exc_info.value.origin is route
     assert exc_info.value.origin.is_pass_through
 
+    # Quiet pass-through, i.e. resolved to the request itself
+    resolved = router.resolve(request, quiet=True)
+    assert resolved.route is route
+    assert resolved.response is request
+    assert router.calls.last.optional_response is None
+
     route.pass_through(False)
     resolved = router.resolve(request)
 
@@ -176,6 +197,51 @@ def test_mod_response():
         router.route() % []  # type: ignore[operator]
 
 
+def test_response_template():
+    router = Router()
+    route = router.get("https://foo.bar/").respond(
+        201, headers={"X-Foo": "bar"}, json={"foo": "bar"}, http_version="HTTP/2"
+    )
+
+    request1 = httpx.Request("GET", "https://foo.bar/")
+    request2 = httpx.Request("GET", "https://foo.bar/")
+    response1 = router.handler(request1)
+    response2 = router.handler(request2)
+
+    assert response1 is not response2
+    assert response1 is not route.return_value
+    assert response1.request is request1
+    assert response2.request is request2
+    assert response1.status_code == response2.status_code == 201
+    assert response1.headers["X-Foo"] == response2.headers["X-Foo"] == "bar"
+    assert response1.json() == response2.json() == {"foo": "bar"}
+    assert response1.http_version == "HTTP/2"
+    assert response1.content is response2.content  # Shared body buffer
+
+    # Headers and extensions are per response
+    response1.headers["X-Foo"] = "baz"
+    response1.extensions["foo"] = "bar"
+    assert router.handler(request1).headers["X-Foo"] == "bar"
+    assert "foo" not in router.handler(request1).extensions
+
+    # Reused response with custom stream is cloned per request
+    class Stream(httpx.SyncByteStream):
+        def __iter__(self):
+            yield b"foobar"
+
+    stream = Stream()
+    route.return_value = httpx.Response(202, stream=stream)
+    response = router.handler(request1)
+    assert response is not route.return_value
+    assert response.stream is stream
+    assert response.read() == b"foobar"
+
+    # Response already bound to a request is returned as is
+    bound_response = httpx.Response(203, request=request2)
+    route.return_value = bound_response
+    assert router.handler(request1) is bound_response
+
+
 async def test_async_side_effect():
     router = Router()
 
@@ -400,6 +466,139 @@ def test_rollback():
     assert route.return_value is None
 
 
+def test_reads_content():
+    router = Router()
+    route = router.get("https://foo.bar/")
+
+    def reads_content():
+        return router.reads_content
+
+    assert not reads_content()
+    assert not reads_content()  # Cached
+
+    router.snapshot()
+    route.side_effect = lambda request: None
+    assert reads_content()
+    route.mock(return_value=httpx.Response(204))
+    assert not reads_content()
+
+    router.post("https://foo.bar/", json={"foo": "bar"}, name="json")
+    assert reads_content()
+    router.pop("json")
+    assert not reads_content()
+
+    router.route(content=b"foo")
+    assert reads_content()
+    router.clear()
+    assert not reads_content()
+    router.rollback()
+    assert not reads_content()
+    assert len(router.routes) == 1
+
+
+def test_rollback_iterator_side_effect():
+    produced = []
+
+    def responses():
+        status_code = 200
+        while True:
+            produced.append(status_code)
+            yield httpx.Response(status_code)
+            status_code += 1
+
+    router = Router()
+    route = router.get("https://foo.bar/").mock(side_effect=responses())
+    request = httpx.Request("GET", "https://foo.bar/")
+
+    router.snapshot()  # Lazy, i.e. nothing produced
+    assert produced == []
+    assert router.handler(request).status_code == 200
+
+    router.snapshot()
+    assert router.handler(request).status_code == 201
+    assert router.handler(request).status_code == 202
+
+    router.rollback()  # Replays items consumed since snapshot
+    assert router.handler(request).status_code == 201
+    assert router.handler(request).status_code == 202
+    assert router.handler(request).status_code == 203
+
+    router.rollback()
+    assert router.handler(request).status_code == 200
+    assert produced == [200, 201, 202, 203]
+
+    # Infinite iterator
+    route.side_effect = itertools.cycle([httpx.Response(201), httpx.Response(202)])
+    router.snapshot()
+    assert router.handler(request).status_code == 201
+    router.rollback()
+    assert router.handler(request).status_code == 201
+    assert router.handler(request).status_code == 202
+    assert router.handler(request).status_code == 201
+
+
+def test_sequence_side_effect():
+    router = Router()
+    request = httpx.Request("GET", "https://foo.bar/")
+    route = router.get("https://foo.bar/").mock(
+        side_effect=respx.sequence(
+            (httpx.Response(500), 2),
+            (httpx.ConnectError, 1),
+            (httpx.Response(200), 10_000_000),
+        )
+    )
+
+    router.snapshot()
+    assert router.handler(request).status_code == 500
+    router.snapshot()  # Copies position, i.e. not materialized
+    assert router.handler(request).status_code == 500
+    with pytest.raises(httpx.ConnectError):
+        router.handler(request)
+    assert router.handler(request).status_code == 200
+
+    router.rollback()
+    assert router.handler(request).status_code == 500
+    with pytest.raises(httpx.ConnectError):
+        router.handler(request)
+    router.rollback()
+    assert router.handler(request).status_code == 500
+    assert route.call_count == 1
+
+    # Exhausted
+    route.side_effect = respx.sequence((httpx.Response(201), 1))
+    assert router.handler(request).status_code == 201
+    with pytest.raises(StopIteration):
+        router.handler(request)
+
+    # Forever
+    route.side_effect = respx.sequence(
+        (httpx.Response(500), 1), (httpx.Response(200), ...)
+    )
+    status_codes = [router.handler(request).status_code for _ in range(4)]
+    assert status_codes == [500, 200, 200, 200]
+
+    # Cycled
+    route.side_effect = respx.sequence(
+        (httpx.Response(500), 2), (httpx.Response(200), 1), cycle=True
+    )
+    status_codes = [router.handler(request).status_code for _ in range(7)]
+    assert status_codes == [500, 500, 200, 500, 500, 200, 500]
+
+
+@pytest.mark.parametrize(
+    "runs",
+    [
+        (),
+        ((httpx.Response(200), 0),),
+        ((httpx.Response(200), "1"),),
+        ((httpx.Response(500), ...), (httpx.Response(200), 1)),
+    ],
+)
+def test_invalid_sequence(runs):
+    with pytest.raises(ValueError):
+        respx.sequence(*runs)
+
+
 def test_multiple_pattern_values_type_error():
     router = Router()
     with pytest.raises(TypeError, match="Got multiple values for pattern 'method'"):
@@ -534,3 +733,291 @@ def test_routelist__unable_to_slice_assign():
     routes = RouteList()
     with pytest.raises(TypeError, match="slice assign"):
         routes[0:1] = routes
+
+
+def test_dump_load(tmp_path):
+    router = Router(base_url="https://foo.bar/", assert_all_called=False)
+    router.get("/users/", name="users").respond(json=[], delay=0.1)
+    router.get(url__regex=r"/users/(?P<id>\d+)/").respond(204)
+    router.post("/users/").pass_through()
+    router.delete("/users/")
+
+    path = tmp_path / "routes"
+    key = router.dump(path)
+    assert router.dump(path) == key  # Content hash
+
+    loaded = Router.load(path, key=key, assert_all_called=False)
+    assert list(loaded.routes) == list(router.routes)
+    assert loaded["users"].return_value is not None
+    assert loaded["users"]._delay is not None
+    assert loaded.routes[2].is_pass_through
+    assert loaded.routes[3].return_value is None
+
+    request = httpx.Request("GET", "https://foo.bar/users/123/")
+    resolved = loaded.resolve(request)
+    assert resolved.route is loaded.routes[1]
+    assert isinstance(resolved.response, httpx.Response)
+    assert resolved.response.status_code == 204
+    resolved = loaded.resolve(httpx.Request("GET", "https://foo.bar/users/"))
+    assert isinstance(resolved.response, httpx.Response)
+    assert resolved.response.json() == []
+
+    # Rolled back to loaded state
+    loaded.snapshot()
+    loaded["users"].respond(404)
+    loaded.rollback()
+    assert loaded["users"].return_value is not None
+    assert loaded["users"].return_value.status_code == 200
+
+    with pytest.raises(ValueError, match="Stale"):
+        Router.load(path, key="foobar")
+
+    path.write_bytes(path.read_bytes()[:-1])
+    with pytest.raises(ValueError, match="corrupt"):
+        Router.load(path)
+
+
+def test_dump__stable_key(tmp_path):
+    script = (
+        "import sys, respx\n"
+        "from respx.timing import Uniform\n"
+        "router = respx.Router()\n"
+        "router.get('https://foo.bar/', cookies={c: c for c in 'abcdefgh'})\n"
+        "router.get('https://ham.spam/').respond(delay=Uniform(1, 2))\n"
+        "router.get('https://egg.plant/').respond(delay=1)\n"
+        "print(router.dump(sys.argv[1]))\n"
+    )
+    keys = {
+        subprocess.run(
+            [sys.executable, "-c", script, str(tmp_path / "routes")],
+            env={**os.environ, "PYTHONHASHSEED": str(seed)},
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout
+        for seed in range(4)
+    }
+    router = Router()
+    router.get("https://foo.bar/", cookies={c: c for c in "abcdefgh"})
+    router.get("https://ham.spam/").respond(delay=Uniform(1, 2))
+    router.get("https://egg.plant/").respond(delay=1)
+    assert keys == {router.dump(tmp_path / "routes") + "\n"}
+
+    loaded = Router.load(tmp_path / "routes", assert_all_mocked=False)
+    request = httpx.Request("GET", "https://foo.bar/", cookies={"z": "z"})
+    assert loaded.resolve(request).route is None
+    cookies = {c: c for c in "abcdefgh"}
+    request = httpx.Request("GET", "https://foo.bar/", cookies=cookies)
+    assert loaded.resolve(request).route is loaded.routes[0]
+    assert 1 <= loaded.resolve(httpx.Request("GET", "https://ham.spam/")).delay <= 2
+    assert loaded.resolve(httpx.Request("GET", "https://egg.plant/")).delay == 1
+
+
+def test_dump__unserializable(tmp_path):
+    router = Router()
+    router.get("https://foo.bar/").mock(side_effect=httpx.ConnectError)
+    with pytest.raises(TypeError, match="side effect"):
+        router.dump(tmp_path / "routes")
+
+    router = Router()
+    router.get("https://foo.bar/").return_value = httpx.Response(
+        200, content=iter([b"foo"])
+    )
+    with pytest.raises(TypeError, match="streamed response"):
+        router.dump(tmp_path / "routes")
+
+
+async def test_observe():
+    router = Router(assert_all_mocked=False)
+    router.get("https://foo.bar/", name="foo") % 404
+    router.post("https://foo.bar/").pass_through()
+    router.put("https://foo.bar/").mock(side_effect=ValueError)
+
+    class Recorder(Observer):
+        def __init__(self):
+            self.events = []
+
+        def on_resolve_start(self, event):
+            self.events.append(("start", event))
+
+        def on_route_match(self, event):
+            self.events.append(("match", event))
+
+    stats = router.observe(ResolveStats())
+    recorder = router.observe(Recorder())
+    assert router.observe(Observer())
+
+    request = httpx.Request("GET", "https://foo.bar/")
+    router.resolve(request)
+    await router.aresolve(request)
+    router.resolve(request, quiet=True)
+    router.resolve(httpx.Request("POST", "https://foo.bar/"), quiet=True)
+    router.resolve(httpx.Request("DELETE", "https://foo.bar/"))
+    with pytest.raises(ValueError):
+        router.resolve(httpx.Request("PUT", "https://foo.bar/"))
+
+    assert len(stats) == 6
+    assert stats.hits["foo"] == 3
+    assert stats.misses == 1
+    assert stats.pass_throughs == 1
+    assert sum(stats.hits.values()) == 5
+    assert 0 < stats.p50 <= stats.p99 == stats.percentile(100)
+
+    kind, start = recorder.events[0]
+    assert kind == "start"
+    assert start.request is request
+    assert start.route is None
+    kind, event = recorder.events[1]
+    assert kind == "match"
+    assert event.started_ns == start.started_ns
+    assert event.elapsed_ns > 0
+    assert event.routes_evaluated == 1
+    assert event.route is router["foo"]
+    assert event.response.status_code == 404
+    kind, event = recorder.events[-1]
+    assert event.routes_evaluated == 3
+    assert event.response is None  # Raised side effect
+
+    stats.reset()
+    assert stats.p50 == 0 and not stats.hits and not stats.misses
+    router.unobserve(stats)
+    router.resolve(request)
+    assert len(stats) == 0
+
+
+async def test_observe__raising():
+    router = Router()
+    router.get("https://foo.bar/") % 204
+
+    class Raiser(Observer):
+        def on_resolve_start(self, event):
+            raise RuntimeError("observer")
+
+    router.observe(Raiser())
+    request = httpx.Request("GET", "https://foo.bar/")
+    with pytest.raises(RuntimeError, match="observer"):
+        router.resolve(request)
+    with pytest.raises(RuntimeError, match="observer"):
+        await router.aresolve(request)
+    assert not router.calls
+
+
+async def test_profile():
+    router = Router(assert_all_mocked=False)
+    router.post("https://foo.bar/", name="foo", json={"foo": "bar"})
+    route = router.route(M(content__contains=b"ham") | M(method="PUT"))
+    router.route(M(host="ham.spam") & ~M(method="GET"))
+
+    with router.profile() as profiler:
+        router.resolve(httpx.Request("POST", "https://foo.bar/", json={"foo": "bar"}))
+        router.resolve(httpx.Request("POST", "https://foo.bar/", content=b"ham"))
+        router.resolve(httpx.Request("GET", "https://ham.spam/"))
+        profiler.start()  # Already profiled
+
+    router.resolve(httpx.Request("GET", "https://ham.spam/"))  # Not profiled
+    assert "match" not in vars(route)
+
+    assert profiler.routes["foo"].evaluations == 3
+    assert profiler.routes["foo"].matches == 1
+    assert profiler.routes["foo"].match_rate == 1 / 3
+    assert profiler.patterns["json__eq"].evaluations == 2
+    assert profiler.patterns["content__contains"].matches == 1
+    assert profiler.patterns["method__eq"].evaluations == 4
+    assert profiler.patterns["method__eq"].miss_ns > 0
+
+    data = json.loads(profiler.to_json())
+    assert data["routes"]["foo"]["matches"] == 1
+    assert data["patterns"]["host__eq"]["matches"] == 3
+
+    report = profiler.report(limit=2)
+    assert "Routes by cumulative time:" in report
+    assert "Patterns by missing time:" in report
+    assert report.count("foo") == 2
+
+    profiler.reset()
+    assert profiler.routes["foo"].evaluations == 0
+    assert profiler.routes["foo"].match_rate == 0.0
+    assert "0.00  foo" in profiler.report()
+
+
+def test_freeze():
+    router = Router()
+    foo = router.get("https://foo.bar/", name="foo")
+    ham = router.get("https://ham.spam/", name="ham")
+    request = httpx.Request("GET", "https://foo.bar/")
+
+    router.freeze(workers=2)
+    shared = router._shared
+    assert shared is not None
+    try:
+        assert gc.get_freeze_count() > 0
+
+        # Parent calls are recorded as usual
+        router.resolve(request)
+        assert router.call_count(foo) == 1
+        assert router.calls.call_count == 1
+
+        # Emulate a forked child
+        shared.pid = -1
+        router.resolve(httpx.Request("GET", "https://ham.spam/"))
+        router.resolve(httpx.Request("GET", "https://ham.spam/"))
+        router.record(httpx.Request("GET", "https://egg.plant/"))  # Unmatched
+        assert router.calls.call_count == 1
+        shared.pid, shared._slot = os.getpid(), None
+
+        if hasattr(os, "fork"):  # pragma: no branch
+            pid = os.fork()
+            if pid == 0:  # pragma: nocover
+                try:
+                    router.resolve(httpx.Request("GET", "https://ham.spam/"))
+                    router.resolve(httpx.Request("GET", "https://egg.plant/"))
+                finally:
+                    os._exit(0)
+            os.waitpid(pid, 0)
+
+        # Forked calls are only counted, and merged by the parent
+        assert router.call_count(ham) == 3
+        assert ham.call_count == 0
+        assert router.calls.call_count == 1
+        router.assert_all_called()
+
+        # Emulate another forked child, with all slots claimed
+        shared.pid = -1
+        with pytest.raises(RuntimeError, match="slots"):
+            router.resolve(request)
+
+        # Routes added after freezing are recorded as usual
+        egg = router.get("https://egg.plant/")
+        router.resolve(httpx.Request("GET", "https://egg.plant/"))
+        assert router.call_count(egg) == egg.call_count == 1
+    finally:
+        router.unfreeze()
+
+    assert gc.get_freeze_count() == 0
+    assert router.call_count(ham) == 0
+
+
+def test_freeze__shared():
+    router = Router()
+    foo = router.get("https://foo.bar/")
+    other = Route(host="foo.bar")
+
+    # Already frozen garbage collector is left frozen
+    gc.freeze()
+    try:
+        router.freeze(workers=1)
+        shared = router._shared
+        assert shared is not None
+
+        # Reused id of a collected route is not counted as the frozen route
+        shared.indexes[id(other)] = shared.indexes[id(foo)]
+        shared.pid = -1
+        router.resolve(httpx.Request("GET", "https://foo.bar/"))
+        assert router.call_count(foo) == 1
+        assert router.call_count(other) == 0
+        assert not shared.count_call(other)
+
+        router.unfreeze()
+        assert gc.get_freeze_count() > 0
+    finally:
+        gc.unfreeze()
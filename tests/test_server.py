@@ -0,0 +1,180 @@
+import asyncio
+import gc
+import gzip
+import socket
+import urllib.request
+
+import httpx
+import pytest
+
+import respx
+from respx.router import Router
+
+
+@pytest.fixture
+def router():
+    router = Router(assert_all_mocked=True)
+    router.route(method__in=["GET", "HEAD"], path="/foo/", name="foo").respond(
+        json={"foo": "bar"}
+    )
+    router.post(path="/echo/").mock(
+        side_effect=lambda request: httpx.Response(201, content=request.content)
+    )
+    router.route(method__in=["GET", "HEAD"], path="/stream/").respond(
+        stream=httpx.ByteStream(b"stream")
+    )
+    router.get(path="/sync/").mock(
+        side_effect=lambda request: httpx.Response(200, content=iter([b"sync"]))
+    )
+    router.get(path="/gzip/").respond(
+        content=gzip.compress(b"gzip"), headers={"Content-Encoding": "gzip"}
+    )
+    router.get(path__regex=r"/status/(?P<code>\d+)/").mock(
+        side_effect=lambda request, code: httpx.Response(
+            int(code), content=b"", headers={"Content-Length": "13"}
+        )
+    )
+    router.get(path="/error/").mock(side_effect=httpx.ConnectError)
+    router.get(path="/fail/").mock(side_effect=ValueError("boom"))
+    router.get(path="/pass/").pass_through()
+    return router
+
+
+async def request(server, data):
+    reader, writer = await asyncio.open_connection(server.host, server.port)
+    writer.write(data)
+    writer.write_eof()
+    response = await reader.read()
+    writer.close()
+    return response
+
+
+async def test_serve(router):
+    async with respx.serve(router) as server, respx.mock() as respx_mock:
+        respx_mock.route(port=server.port).pass_through()
+
+        async with httpx.AsyncClient(base_url=server.url) as client:
+            # Concurrent requests over keep-alive connections
+            responses = await asyncio.gather(*(client.get("/foo/") for _ in range(20)))
+            assert all(r.json() == {"foo": "bar"} for r in responses)
+
+            response = await client.post("/echo/", content=b"ham")
+            assert response.status_code == 201
+            assert response.content == b"ham"
+
+            async def chunks():
+                yield b"chunked "
+                yield b"spam"
+
+            response = await client.post("/echo/", content=chunks())
+            assert response.content == b"chunked spam"
+
+            response = await client.get("/stream/")
+            assert response.content == b"stream"
+            response = await client.head("/stream/")
+            assert "Content-Length" not in response.headers
+
+            response = await client.get("/sync/")
+            assert response.content == b"sync"
+
+            response = await client.get("/gzip/")
+            assert response.headers["Content-Encoding"] == "gzip"
+            assert response.content == b"gzip"
+
+            response = await client.head("/foo/")
+            assert response.headers["Content-Length"] == "13"
+            assert response.content == b""
+
+            response = await client.get("/nope/")
+            assert response.status_code == 404
+            assert "not mocked" in response.text
+
+            response = await client.get("/pass/")
+            assert response.status_code == 502
+
+            response = await client.get("/fail/")
+            assert response.status_code == 500
+            assert response.text == "ValueError: boom"
+
+            with pytest.raises(httpx.RemoteProtocolError):
+                await client.get("/error/")
+
+        assert router["foo"].call_count == 21
+        assert router["foo"].calls.last.request.url == server.url.join("/foo/")
+
+    await server.stop()  # Already stopped
+
+
+async def test_serve_protocol(router):
+    async with respx.serve(router, port=0) as server:
+        response = await request(server, b"GET /foo/ HTTP/1.0\r\n\r\n")
+        assert response.startswith(b"HTTP/1.1 200 OK\r\n")
+        assert b"Connection: close\r\n" in response
+
+        response = await request(
+            server,
+            b"POST /echo/ HTTP/1.1\r\nHost: foo.bar\r\nExpect: 100-continue\r\n"
+            b"Transfer-Encoding: chunked\r\nConnection: close\r\n\r\n"
+            b"3;ext\r\nham\r\n0\r\nX-Trailer: spam\r\n\r\n",
+        )
+        assert response.startswith(b"HTTP/1.1 100 Continue\r\n\r\nHTTP/1.1 201")
+        assert response.endswith(b"\r\n\r\nham")
+        assert router.calls.last.request.url == "http://foo.bar/echo/"
+
+        response = await request(
+            server, b"GET http://ham.spam/foo/ HTTP/1.1\r\nConnection: close\r\n\r\n"
+        )
+        assert response.startswith(b"HTTP/1.1 200 OK\r\n")
+        assert router.calls.last.request.url == "http://ham.spam/foo/"
+
+        for data in (b"GET /foo/ HTTP/2\r\n\r\n", b"nope\r\n\r\n"):
+            response = await request(server, data)
+            assert response.startswith(b"HTTP/1.1 400 Bad Request\r\n")
+
+        assert await request(server, b"GET /foo/ HTTP/1.1\r\n") == b""
+
+        # No body, nor length, for 1xx and 204 responses, only length for 304
+        for code, length in ((103, b""), (204, b""), (304, b"Content-Length: 13\r\n")):
+            response = await request(
+                server, b"GET /status/%d/ HTTP/1.1\r\nConnection: close\r\n\r\n" % code
+            )
+            assert response.startswith(b"HTTP/1.1 %d " % code)
+            assert response.endswith(b"\r\n" + length + b"Connection: close\r\n\r\n")
+
+
+async def test_serve_stop(router):
+    async with respx.serve(router) as server:
+        reader, writer = await asyncio.open_connection(server.host, server.port)
+        writer.write(b"GET /foo/ HTTP/1.1\r\n\r\n")
+        await reader.readuntil(b'{"foo":"bar"}')
+
+        # Idle keep-alive connections are closed when stopping
+        await asyncio.wait_for(server.stop(), 5)
+        assert await asyncio.wait_for(reader.read(), 5) == b""
+        writer.close()
+
+
+def test_serve_threaded(router, caplog):
+    with respx.serve(router) as server:
+        with urllib.request.urlopen(str(server.url.join("/foo/"))) as response:
+            assert response.read() == b'{"foo":"bar"}'
+
+        # Idle keep-alive connection, still open when exiting
+        sock = socket.create_connection((server.host, server.port))
+        sock.sendall(b"GET /foo/ HTTP/1.1\r\n\r\n")
+        response = b""
+        while not response.endswith(b'{"foo":"bar"}'):
+            chunk = sock.recv(1024)
+            assert chunk, response
+            response += chunk
+
+    with sock:
+        assert sock.recv(1024) == b""
+    assert not server._handlers
+    gc.collect()
+    assert "destroyed but it is pending" not in caplog.text
+
+    with respx.serve(router, port=server.port) as server:
+        with pytest.raises(OSError):
+            with respx.serve(router, port=server.port):
+                pass  # pragma: nocover
@@ -0,0 +1,248 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+import respx
+from respx.router import Router
+from respx.timing import Fixed, Normal, Percentiles, Uniform, VirtualClock, parse_delay
+
+
+def test_delay_models():
+    assert Fixed(0.5).sample() == 0.5
+
+    uniform = Uniform(0.1, 0.2, seed=1)
+    samples = [uniform.sample() for _ in range(100)]
+    assert all(0.1 <= sample <= 0.2 for sample in samples)
+    assert samples[0] == Uniform(0.1, 0.2, seed=1).sample()  # Reproducible
+
+    normal = Normal(0.1, 1.0, seed=1)
+    assert all(normal.sample() >= 0 for _ in range(100))
+
+    percentiles = Percentiles({50: 0.01, 99: 0.2, 100: 1.0}, seed=1)
+    samples = [percentiles.sample() for _ in range(1000)]
+    assert all(0.01 <= sample <= 1.0 for sample in samples)
+    assert sorted(samples)[400] == 0.01
+    assert 0.01 < sorted(samples)[980] < 0.2
+    percentiles = Percentiles({10: 0.1, 20: 0.2}, seed=1)
+    assert max(percentiles.sample() for _ in range(100)) == 0.2
+
+    assert parse_delay(None) is None
+    assert isinstance(parse_delay(1), Fixed)
+    assert parse_delay(percentiles) is percentiles
+
+
+@pytest.mark.parametrize(
+    ("factory", "error"),
+    [
+        (lambda: Fixed(-1), ValueError),
+        (lambda: Uniform(0.2, 0.1), ValueError),
+        (lambda: Normal(-1, 0.1), ValueError),
+        (lambda: Percentiles({}), ValueError),
+        (lambda: Percentiles({101: 0.1}), ValueError),
+        (lambda: Percentiles({50: 0.2, 99: 0.1}), ValueError),
+        (lambda: parse_delay("1s"), TypeError),  # type: ignore[arg-type]
+        (lambda: Router(bandwidth=0), ValueError),
+    ],
+)
+def test_invalid_delay(factory, error):
+    with pytest.raises(error):
+        factory()
+
+
+async def test_route_delay():
+    router = Router(assert_all_mocked=False)
+    route = router.get("https://foo.bar/").respond(204, delay=0.05)
+    router.get("https://ham.spam/").mock(side_effect=httpx.ReadTimeout, delay=0.05)
+    request = httpx.Request("GET", "https://foo.bar/")
+
+    start = time.monotonic()
+    response = router.handler(request)
+    assert time.monotonic() - start >= 0.05
+    assert response.status_code == 204
+
+    start = time.monotonic()
+    response = await router.async_handler(request)
+    assert time.monotonic() - start >= 0.05
+    assert response.status_code == 204
+
+    # Slow error, e.g. a simulated timeout
+    request = httpx.Request("GET", "https://ham.spam/")
+    start = time.monotonic()
+    with pytest.raises(httpx.ReadTimeout):
+        router.handler(request)
+    assert time.monotonic() - start >= 0.05
+    start = time.monotonic()
+    with pytest.raises(httpx.ReadTimeout):
+        await router.async_handler(request)
+    assert time.monotonic() - start >= 0.05
+
+    # Not mocked, i.e. no delay
+    request = httpx.Request("GET", "https://example.org/")
+    assert router.resolve(request).delay == 0
+
+    # Respond without delay resets route delay
+    route.respond(200)
+    resolved = router.resolve(httpx.Request("GET", "https://foo.bar/"))
+    assert resolved.route is route
+    assert resolved.delay == 0
+
+
+async def test_router_delay():
+    async with respx.mock(delay=Uniform(0.03, 0.05)) as respx_mock:
+        respx_mock.get("https://foo.bar/") % 204
+        route = respx_mock.get("https://ham.spam/").respond(200, delay=0)
+
+        start = time.monotonic()
+        async with httpx.AsyncClient() as client:
+            response = await client.get("https://foo.bar/")
+        assert time.monotonic() - start >= 0.03
+        assert response.status_code == 204
+
+        # Route delay overrides router delay
+        resolved = respx_mock.resolve(httpx.Request("GET", "https://ham.spam/"))
+        assert resolved.route is route
+        assert resolved.delay == 0
+        assert (
+            0.03
+            <= respx_mock.resolve(httpx.Request("GET", "https://foo.bar/")).delay
+            <= 0.05
+        )
+
+
+@pytest.mark.parametrize("using", ["httpcore", "httpx"])
+async def test_bandwidth(using):
+    content = b"x" * 1000
+    async with respx.mock(using=using, bandwidth=100_000) as respx_mock:
+        respx_mock.get("https://foo.bar/").respond(content=content)
+        respx_mock.get("https://ham.spam/").respond(content=content, bandwidth=10_000)
+
+        start = time.monotonic()
+        response = httpx.get("https://foo.bar/")
+        assert time.monotonic() - start >= 0.01
+        assert response.content == content
+
+        start = time.monotonic()
+        async with httpx.AsyncClient() as client:
+            response = await client.get("https://ham.spam/")
+        assert time.monotonic() - start >= 0.1
+        assert response.content == content
+
+        # Throttled in slices
+        async with httpx.AsyncClient() as client:
+            async with client.stream("GET", "https://ham.spam/") as response:
+                chunks = [chunk async for chunk in response.aiter_raw()]
+        assert [len(chunk) for chunk in chunks] == [500, 500]
+
+
+async def test_virtual_time():
+    async with respx.mock(virtual_time=True) as respx_mock:
+        assert isinstance(respx_mock.clock, VirtualClock)
+        respx_mock.get("https://foo.bar/").respond(204, delay=30)
+        respx_mock.get("https://ham.spam/").respond(content=b"x" * 100, bandwidth=10)
+        respx_mock.get("https://egg.yolk/").mock(
+            side_effect=httpx.ConnectTimeout, delay=10
+        )
+
+        wall_start = time.perf_counter()
+        start = time.monotonic()
+        loop_start = asyncio.get_running_loop().time()
+
+        async with httpx.AsyncClient() as client:
+            response = await client.get("https://foo.bar/")
+            assert response.status_code == 204
+            response = await client.get("https://ham.spam/")
+            assert len(response.content) == 100
+            with pytest.raises(httpx.ConnectTimeout):
+                await client.get("https://egg.yolk/")
+
+        # Patched sleeps, e.g. retry backoff
+        time.sleep(60)
+        await asyncio.sleep(60)
+        await asyncio.wait_for(asyncio.sleep(120), timeout=300)
+
+        with httpx.Client() as client:
+            response = client.get("https://foo.bar/")
+            assert response.status_code == 204
+            response = client.get("https://ham.spam/")
+            assert len(response.content) == 100
+
+        elapsed = time.monotonic() - start
+        assert 330 <= elapsed < 331
+        assert 330 <= asyncio.get_running_loop().time() - loop_start < 331
+        assert 329 < respx_mock.clock.offset <= 330
+        assert time.perf_counter() - wall_start < 10
+
+    # Clock is restored
+    start = time.monotonic()
+    await asyncio.sleep(0.01)
+    time.sleep(0.01)
+    assert 0.02 <= time.monotonic() - start < 1
+
+
+async def test_virtual_time__timers():
+    async with respx.mock(virtual_time=True) as respx_mock:
+        route = respx_mock.get("https://foo.bar/").respond(204, delay=5)
+
+        start = time.monotonic()
+        async with httpx.AsyncClient() as client:
+            # Deadline fires before delayed response
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(client.get("https://foo.bar/"), 1)
+            assert 1 <= time.monotonic() - start < 2
+            response = await asyncio.wait_for(client.get("https://foo.bar/"), 10)
+            assert response.status_code == 204
+            assert 6 <= time.monotonic() - start < 7
+        assert route.call_count == 2
+
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(asyncio.sleep(10), 1)
+        assert 7 <= time.monotonic() - start < 8
+
+        # Concurrent sleeps wake up in order
+        woken = []
+
+        async def sleeper(seconds):
+            woken.append(await asyncio.sleep(seconds, result=seconds))
+
+        await asyncio.gather(sleeper(3), sleeper(1), sleeper(2))
+        assert woken == [1, 2, 3]
+        assert 10 <= time.monotonic() - start < 11
+        assert await asyncio.sleep(0, "result") == "result"
+
+
+async def test_virtual_time__foreign_loop(monkeypatch):
+    # Emulate an event loop not based on asyncio.BaseEventLoop, e.g. uvloop
+    monkeypatch.setattr(asyncio, "BaseEventLoop", type("BaseEventLoop", (), {}))
+    clock = VirtualClock()
+    clock.start()
+    try:
+        start = time.monotonic()
+        assert await asyncio.sleep(10, "result") == "result"
+        assert 10 <= time.monotonic() - start < 11
+    finally:
+        clock.stop()
+
+
+def test_virtual_time__sync():
+    assert Router().clock.monotonic() <= time.monotonic()
+
+    clock = VirtualClock()
+    clock.start()
+    clock.start()  # Idempotent
+    try:
+        start = time.monotonic()
+        time.sleep(3600)
+        time.sleep(-1)
+        assert 3600 <= time.monotonic() - start < 3601
+    finally:
+        clock.stop()
+    assert time.monotonic() - start < 3600
+
+    with respx.mock(virtual_time=True) as respx_mock:
+        route = respx_mock.get("https://foo.bar/").respond(delay=3600)
+        start = time.monotonic()
+        httpx.get("https://foo.bar/")
+        assert route.called
+        assert time.monotonic() - start >= 3600
@@ -5,7 +5,7 @@ import pytest
 
 from respx.models import PassThrough
 from respx.router import Router
-from respx.transports import MockTransport
+from respx.transports import MockTransport, TryTransport
 
 
 def test_sync_transport_handler():
@@ -68,3 +68,25 @@ async def test_transport_assertions():
 def test_required_kwarg():
     with pytest.raises(RuntimeError, match="argument"):
         MockTransport()
+
+
+async def test_try_transport():
+    url = "https://foo.bar/"
+
+    router = Router(assert_all_called=False)
+    router.get(url) % 404
+    router.post(url).pass_through()
+    real_transport = httpx.MockTransport(lambda request: httpx.Response(200))
+
+    # Raised pass-through, e.g. using router handler
+    transport = TryTransport([httpx.MockTransport(router.handler), real_transport])
+    with httpx.Client(transport=transport) as client:
+        assert client.get(url).status_code == 404
+        assert client.post(url).status_code == 200
+
+    transport = TryTransport(
+        [httpx.MockTransport(router.async_handler), real_transport]
+    )
+    async with httpx.AsyncClient(transport=transport) as async_client:
+        assert (await async_client.get(url)).status_code == 404
+        assert (await async_client.post(url)).status_code == 200
@@ -1,6 +1,16 @@
+import pickle
 from datetime import datetime, timezone
 
-from respx.utils import SetCookie
+import httpx
+import pytest
+
+from respx.utils import (
+    Digest,
+    SetCookie,
+    _parse_multipart_form_data,
+    decode_data,
+    get_arg_names,
+)
 
 
 class TestSetCookie:
@@ -31,3 +41,99 @@ class TestSetCookie:
                 "Partitioned"
             ),
         )
+
+
+def test_get_arg_names():
+    def side_effect(request, route):
+        pass  # pragma: nocover
+
+    assert get_arg_names(side_effect) == ("request", "route")
+    assert get_arg_names(side_effect) is get_arg_names(side_effect)  # Cached
+
+    class SideEffect:
+        __hash__ = None  # type: ignore[assignment]
+
+        def __call__(self, request):
+            pass  # pragma: nocover
+
+    # Unhashable callable
+    assert get_arg_names(SideEffect()) == ("self", "request")
+
+
+@pytest.mark.parametrize(
+    ("content_type", "content", "data", "files"),
+    [
+        (
+            'multipart/form-data; boundary="foo"',
+            b"preamble\r\n"
+            b"--foo\r\n"
+            b'Content-Disposition: form-data; name="a"\r\n'
+            b"Content-Type: text/plain; charset=latin-1\r\n\r\n"
+            b"\xe4\r\n"
+            b"--foo\r\n"
+            b'Content-Disposition: form-data; name="b"; filename="b \\"1\\".txt"\r\n'
+            b"\r\n"
+            b"bar\r\n\r\n"
+            b"--foo--\r\n",
+            {"a": "ä"},
+            {"b": ('b "1".txt', b"bar\r\n")},
+        ),
+        ("multipart/form-data", b"--foo\r\n\r\nbar\r\n--foo--", {}, {}),
+        ("multipart/form-data; boundary=foo", b"bar", {}, {}),
+        ("multipart/form-data; boundary=foo", b"--foo\r\nbar", {}, {}),
+        ("multipart/form-data; boundary=foo", b"--foo\r\n\r\nbar", {}, {}),
+    ],
+)
+def test_parse_multipart_form_data(content_type, content, data, files):
+    parsed_data, parsed_files = _parse_multipart_form_data(
+        content, content_type=content_type, encoding="ascii"
+    )
+    assert parsed_data == data
+    assert parsed_files == files
+    for _, value in parsed_files.values():
+        assert isinstance(value, memoryview)  # Zero-copy view of content
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        b"--foo\n"
+        b'Content-Disposition: form-data; name="a"\n\n'
+        b"bar\n"
+        b"--foo\n"
+        b'Content-Disposition: form-data; name="b"; filename="b.txt"\n\n'
+        b"ham\n"
+        b"--foo--\n",
+        b"--foo\r\n"
+        b'Content-Disposition: form-data; name="a"\r\n'
+        b"Content-Transfer-Encoding: base64\r\n\r\n"
+        b"YmFy\r\n"
+        b"--foo\r\n"
+        b'Content-Disposition: form-data; name="b"; filename="b.txt"\r\n'
+        b"Content-Transfer-Encoding: quoted-printable\r\n\r\n"
+        b"h=61m\r\n"
+        b"--foo--\r\n",
+    ],
+)
+def test_parse_multipart_form_data__lenient(content):
+    data, files = _parse_multipart_form_data(
+        content, content_type="multipart/form-data; boundary=foo", encoding="ascii"
+    )
+    assert data == {"a": "bar"}
+    assert files == {"b": ("b.txt", b"ham")}
+
+
+def test_decode_data():
+    request = httpx.Request("POST", "https://foo.bar/", data={"foo": "bar"})
+    assert decode_data(request) == ({"foo": "bar"}, {})
+    assert decode_data(request) is decode_data(request)  # Cached
+
+
+def test_digest():
+    digest = Digest.of(b"foobar")
+    assert digest == b"foobar"
+    assert digest == memoryview(b"foobar")
+    assert digest != b"foobaz"
+    assert digest != "foobar"
+    assert hash(digest) == hash(Digest(b"foobar"))
+    assert pickle.loads(pickle.dumps(digest)) == digest